@@ -0,0 +1,29 @@
+"""
+Authentication classes for the API.
+"""
+from rest_framework import authentication, exceptions
+from .tokens import InvalidToken, verify_token
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticates `Authorization: Bearer <token>` requests with tokens
+    from the token endpoint (see accounts.api.tokens).
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+
+        try:
+            user = verify_token(auth[1].decode())
+        except (InvalidToken, UnicodeError):
+            raise exceptions.AuthenticationFailed('Invalid or expired token.')
+        return (user, None)
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,21 @@
+"""
+Serializers for the accounts API.
+"""
+from django.contrib.auth import authenticate
+from rest_framework import serializers
+
+
+class TokenObtainSerializer(serializers.Serializer):
+    """Checks a username and password; validated_data['user'] is the user."""
+    username = serializers.CharField()
+    password = serializers.CharField(trim_whitespace=False, style={'input_type': 'password'})
+
+    def validate(self, attrs):
+        user = authenticate(
+            self.context.get('request'),
+            username=attrs['username'],
+            password=attrs['password'],
+        )
+        if user is None:
+            raise serializers.ValidationError('Unable to log in with the provided credentials.')
+        return {'user': user}
@@ -0,0 +1,15 @@
+"""
+Custom throttle classes for the accounts API.
+"""
+from core.throttling import TokenBucketRateThrottle
+
+
+class TokenObtainThrottle(TokenBucketRateThrottle):
+    """
+    Limits token requests per client IP, since each one hashes a password.
+    Uses the 'token' scope from settings.
+    """
+    scope = 'token'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
@@ -0,0 +1,44 @@
+"""
+Signed, expiring API tokens.
+
+A token is the user's pk and token_version signed with SECRET_KEY and a
+timestamp (django.core.signing.TimestampSigner). Verifying one takes an
+HMAC and a cached user lookup, with no password hashing and no token
+table. Tokens expire after ACCOUNTS_API_TOKEN_MAX_AGE seconds; bumping the
+user's token_version revokes all of their tokens at once.
+"""
+from django.conf import settings
+from django.core import signing
+from django.db.models import F
+from accounts.backends import CachedModelBackend
+
+signer = signing.TimestampSigner(salt='accounts.api.token')
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def issue_token(user):
+    """Return a new API token for `user`."""
+    return signer.sign_object({'u': user.pk, 'v': user.token_version})
+
+
+def verify_token(token):
+    """Return the active user a token belongs to, or raise InvalidToken."""
+    try:
+        payload = signer.unsign_object(token, max_age=settings.ACCOUNTS_API_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        # Includes SignatureExpired
+        raise InvalidToken
+    user = CachedModelBackend().get_user(payload['u'])
+    if user is None or user.token_version != payload['v']:
+        raise InvalidToken
+    return user
+
+
+def revoke_tokens(user):
+    """Invalidate every token issued to `user` so far."""
+    user.token_version = F('token_version') + 1
+    user.save(update_fields=['token_version'])
+    user.refresh_from_db(fields=['token_version'])
@@ -0,0 +1,10 @@
+"""
+URL routing for accounts API endpoints.
+"""
+from django.urls import path
+from .views import TokenRevokeView, TokenView
+
+urlpatterns = [
+    path('token/', TokenView.as_view(), name='api-token'),
+    path('token/revoke/', TokenRevokeView.as_view(), name='api-token-revoke'),
+]
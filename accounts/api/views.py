@@ -0,0 +1,39 @@
+"""
+API views for accounts.
+"""
+from django.conf import settings
+from rest_framework import status
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .serializers import TokenObtainSerializer
+from .throttles import TokenObtainThrottle
+from .tokens import issue_token, revoke_tokens
+
+
+class TokenView(APIView):
+    """
+    POST: exchange a username and password for a bearer token.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = [TokenObtainThrottle]
+
+    def post(self, request):
+        serializer = TokenObtainSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        return Response({
+            'token': issue_token(serializer.validated_data['user']),
+            'expires_in': settings.ACCOUNTS_API_TOKEN_MAX_AGE,
+        })
+
+
+class TokenRevokeView(APIView):
+    """
+    POST: revoke every token issued to the authenticated user.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        revoke_tokens(request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,80 @@
+"""
+Authentication backend with a short-lived user cache.
+
+AuthenticationMiddleware loads request.user through the session's backend
+on every authenticated request. CachedModelBackend serves that lookup from
+the cache for ACCOUNTS_USER_CACHE_TIMEOUT seconds. Cached users are dropped
+when the user is saved or deleted (which covers password changes and
+last_login updates) and on logout; changes made with QuerySet.update()
+bypass those signals and show up once the entry expires.
+
+The password hash is not cached. An entry holds the user's other fields
+and the session auth hash, the HMAC of the password hash that Django
+compares with the session's on every request, so session validity is
+unaffected. Rebuilt users have `password` deferred: anything that reads
+it, such as check_password(), loads it from the database, and save()
+leaves it alone.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import router
+from django.utils.crypto import salted_hmac
+
+
+def user_cache_key(user_id):
+    # Session auth hashes depend on SECRET_KEY, so a new key starts a new entry
+    secret_id = salted_hmac('accounts.backends.user_cache_key', '', algorithm='sha256').hexdigest()[:16]
+    return f'accounts:user:{user_id}:{secret_id}'
+
+
+def invalidate_cached_user(user_id):
+    """Drop the cached copy of a user, e.g. after changing it."""
+    cache.delete(user_cache_key(user_id))
+
+
+def cache_user(user):
+    cache.set(
+        user_cache_key(user.pk),
+        {
+            'fields': {
+                field.attname: getattr(user, field.attname)
+                for field in user._meta.concrete_fields
+                if field.attname != 'password'
+            },
+            'session_auth_hash': user.get_session_auth_hash(),
+        },
+        settings.ACCOUNTS_USER_CACHE_TIMEOUT
+    )
+
+
+def load_cached_user(entry):
+    """Rebuild a user from a cache entry, with the password hash deferred."""
+    UserModel = get_user_model()
+    fields = entry['fields']
+    user = UserModel.from_db(router.db_for_read(UserModel), list(fields), list(fields.values()))
+
+    session_auth_hash = entry['session_auth_hash']
+    get_session_auth_hash = user._get_session_auth_hash
+
+    def cached_session_auth_hash(secret=None):
+        # Hashes for SECRET_KEY_FALLBACKS still need the password hash
+        return session_auth_hash if secret is None else get_session_auth_hash(secret)
+
+    user._get_session_auth_hash = cached_session_auth_hash
+    return user
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose get_user() is cached."""
+
+    def get_user(self, user_id):
+        entry = cache.get(user_cache_key(user_id))
+        if entry is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache_user(user)
+            return user
+        user = load_cached_user(entry)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,57 @@
+# Generated by Django 4.2 on 2026-10-18 16:05
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.core.cache import caches
+from django.db import migrations
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+OLD_BACKEND = 'django.contrib.auth.backends.ModelBackend'
+NEW_BACKEND = 'accounts.backends.CachedModelBackend'
+
+
+def rewrite_session_backends(apps, schema_editor):
+    """
+    Sessions store the path of the backend that logged the user in, and
+    are only honored while that path is in AUTHENTICATION_BACKENDS. Point
+    sessions created by ModelBackend at CachedModelBackend so ModelBackend
+    can leave the list without logging anyone out.
+    """
+    Session = apps.get_model('sessions', 'Session')
+    store = import_string(settings.SESSION_ENGINE + '.SessionStore')()
+    # cached_db sessions are read from the cache first; drop stale copies
+    cache_prefix = getattr(store, 'cache_key_prefix', None)
+    sessions = Session.objects.filter(expire_date__gt=timezone.now())
+    batch = []
+    for session in sessions.iterator(chunk_size=2000):
+        data = store.decode(session.session_data)
+        if data.get(BACKEND_SESSION_KEY) != OLD_BACKEND:
+            continue
+        data[BACKEND_SESSION_KEY] = NEW_BACKEND
+        session.session_data = store.encode(data)
+        batch.append(session)
+        if len(batch) >= 500:
+            save_sessions(Session, batch, cache_prefix)
+            batch = []
+    save_sessions(Session, batch, cache_prefix)
+
+
+def save_sessions(Session, sessions, cache_prefix):
+    Session.objects.bulk_update(sessions, ['session_data'])
+    if cache_prefix is not None:
+        caches[settings.SESSION_CACHE_ALIAS].delete_many(
+            [cache_prefix + session.session_key for session in sessions]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_user_token_version'),
+        ('sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(rewrite_session_backends, migrations.RunPython.noop),
+    ]
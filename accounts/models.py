@@ -15,7 +15,11 @@ class User(AbstractUser):
     - phone
     - timezone
     - onboarding_completed
+
+    token_version is embedded in API tokens; bumping it revokes every token
+    issued before (see accounts.api.tokens).
     """
+    token_version = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         db_table = 'auth_user'
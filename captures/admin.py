@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CapturedItem, CapturedImage
+from .models import CapturedItem, CapturedImage, DerivativeJob
 
 
 class CapturedImageInline(admin.TabularInline):
@@ -9,6 +9,14 @@ class CapturedImageInline(admin.TabularInline):
 
 @admin.register(CapturedItem)
 class CapturedItemAdmin(admin.ModelAdmin):
-    list_display = ['short_uuid', 'owner', 'is_complete', 'created_at']
+    list_display = ['short_uuid', 'owner', 'is_complete', 'image_count', 'created_at']
     list_filter = ['is_complete', 'created_at']
+    readonly_fields = ['image_count', 'next_order']
     inlines = [CapturedImageInline]
+
+
+@admin.register(DerivativeJob)
+class DerivativeJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'image', 'status', 'attempts', 'claimed_until', 'created_at']
+    list_filter = ['status']
+    readonly_fields = ['image', 'attempts', 'last_error', 'claimed_until', 'created_at']
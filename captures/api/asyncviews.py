@@ -0,0 +1,64 @@
+"""
+Async dispatch for DRF viewsets.
+
+DRF's APIView.dispatch is synchronous, so under ASGI Django runs every DRF
+view in a worker thread. AsyncViewSetMixin gives a viewset an async
+dispatch: handlers written as `async def` run on the event loop and use
+the async ORM and cache APIs directly, while plain handlers (e.g. ones that
+need transaction.atomic or select_for_update, which have no async API yet)
+keep running in a thread via sync_to_async.
+
+Authentication, permissions and throttling also run in a thread, since
+they may touch the session, the user table and the cache.
+"""
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.http import Http404
+
+
+class AsyncViewSetMixin:
+    """Mixin for a ViewSet whose handlers may be coroutines."""
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        # The view returns dispatch()'s coroutine; tell Django to await it
+        return markcoroutinefunction(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Async version of APIView.dispatch."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            if iscoroutinefunction(handler):
+                response = await handler(request, *args, **kwargs)
+            else:
+                response = await sync_to_async(handler)(request, *args, **kwargs)
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def aget_object(self):
+        """Async version of GenericAPIView.get_object for the viewset's lookup."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            obj = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except queryset.model.DoesNotExist:
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
@@ -0,0 +1,68 @@
+"""
+Custom serializer fields for the captures API.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.fields import get_error_detail
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_validation_executor():
+    """
+    Return the shared, bounded thread pool used for file validation.
+
+    Created lazily so that each (forked) worker process gets its own pool.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.CAPTURES_VALIDATION_WORKERS,
+                    thread_name_prefix='capture-validation',
+                )
+    return _executor
+
+
+class ParallelListField(serializers.ListField):
+    """
+    ListField that validates its children concurrently.
+
+    Per-item validation is fanned out over a bounded thread pool (size set
+    by CAPTURES_VALIDATION_WORKERS). Pillow and libmagic release the GIL
+    while working, so a batch of images validates in roughly the time of
+    the slowest file. Errors are keyed by item index, exactly like
+    ListField, and results keep their input order.
+
+    Falls back to sequential validation for single items or when the
+    pool is configured with one worker or fewer.
+    """
+
+    def run_child_validation(self, data):
+        if len(data) < 2 or settings.CAPTURES_VALIDATION_WORKERS <= 1:
+            return super().run_child_validation(data)
+
+        futures = [
+            get_validation_executor().submit(self.child.run_validation, item)
+            for item in data
+        ]
+
+        result = []
+        errors = {}
+
+        for idx, future in enumerate(futures):
+            try:
+                result.append(future.result())
+            except serializers.ValidationError as e:
+                errors[idx] = e.detail
+            except DjangoValidationError as e:
+                errors[idx] = get_error_detail(e)
+
+        if not errors:
+            return result
+        raise serializers.ValidationError(errors)
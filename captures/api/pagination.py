@@ -0,0 +1,33 @@
+"""
+Pagination classes for the captures API.
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class CaptureCursorPagination(CursorPagination):
+    """
+    Keyset pagination for the capture list, keyed on created_at.
+
+    Rides the (owner, -created_at) index: each page is a range scan from
+    the cursor position, with no COUNT(*) and no OFFSET over earlier rows.
+    Cursors are opaque and stay stable as new captures are added.
+
+    DRF cursors only encode the first ordering field. Captures sharing a
+    created_at timestamp are told apart by an offset stored in the cursor,
+    so -id only makes their order deterministic. Such ties are rare,
+    since timestamps have microsecond precision.
+
+    Selected with ?pagination=cursor; follow-up pages carry ?cursor=.
+    """
+    ordering = ('-created_at', '-id')
+    mode_query_param = 'pagination'
+    mode_query_value = 'cursor'
+
+    @classmethod
+    def is_requested(cls, request):
+        """Return True if the request opts into cursor pagination."""
+        params = request.query_params
+        return (
+            params.get(cls.mode_query_param) == cls.mode_query_value
+            or cls.cursor_query_param in params
+        )
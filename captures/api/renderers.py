@@ -0,0 +1,20 @@
+"""
+Custom renderers for the captures API.
+"""
+import json
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets `Accept: text/event-stream` (sent by EventSource) negotiate.
+
+    Successful event streams are StreamingHttpResponses and bypass rendering;
+    this only renders error responses, as a single SSE `error` event.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return f'event: error\ndata: {json.dumps(data)}\n\n'.encode(self.charset)
@@ -2,20 +2,36 @@
 Serializers for the captures API.
 """
 from rest_framework import serializers
-from captures.models import CapturedItem, CapturedImage
-from captures.validators import validate_image_file
+import os
+from django.core.files.storage import default_storage
+from django.utils.html import escape
+from captures.models import HIGHLIGHT_START, HIGHLIGHT_STOP, CapturedItem, CapturedImage, UploadSession
+from captures.validators import ALLOWED_EXTENSIONS, MAX_FILE_SIZE, validate_image_file
+from .fields import ParallelListField
 
 
 class CapturedImageSerializer(serializers.ModelSerializer):
     """
     Serializer for CapturedImage (nested in CapturedItem).
+
+    derivatives maps size names (e.g. "thumb", "medium") to URLs of resized
+    variants. It is empty until the background worker has processed the image.
     """
+    derivatives = serializers.SerializerMethodField()
 
     class Meta:
         model = CapturedImage
-        fields = ['id', 'short_uuid', 'image', 'order', 'created_at']
+        fields = ['id', 'short_uuid', 'image', 'derivatives', 'order', 'created_at']
         read_only_fields = ['id', 'short_uuid', 'created_at']
 
+    def get_derivatives(self, obj):
+        request = self.context.get('request')
+        urls = {}
+        for size_name, name in obj.derivatives.items():
+            url = default_storage.url(name)
+            urls[size_name] = request.build_absolute_uri(url) if request is not None else url
+        return urls
+
 
 class CapturedItemSerializer(serializers.ModelSerializer):
     """
@@ -24,13 +40,46 @@ class CapturedItemSerializer(serializers.ModelSerializer):
     For POST: Creates empty capture, auto-sets owner from request.user
     For GET: Returns capture with nested images
     For PATCH: Updates voice_transcript
+
+    transcript_revision is the base revision for delta edits via the
+    transcript action.
     """
     images = CapturedImageSerializer(many=True, read_only=True)
 
     class Meta:
         model = CapturedItem
-        fields = ['id', 'short_uuid', 'created_at', 'voice_transcript', 'is_complete', 'images']
-        read_only_fields = ['id', 'short_uuid', 'created_at', 'owner']
+        fields = ['id', 'short_uuid', 'created_at', 'voice_transcript', 'transcript_revision', 'is_complete', 'images']
+        read_only_fields = ['id', 'short_uuid', 'created_at', 'owner', 'transcript_revision']
+
+
+class CaptureSearchSerializer(serializers.Serializer):
+    """Query parameters for transcript search."""
+    q = serializers.CharField(max_length=200)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+
+class CaptureSearchResultSerializer(serializers.ModelSerializer):
+    """
+    A capture matching a transcript search.
+
+    snippet is HTML: the transcript excerpt is escaped and matched terms are
+    wrapped in <mark>. rank orders results (higher is better; always 0 when
+    the database has no full-text search).
+    """
+    snippet = serializers.SerializerMethodField()
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = CapturedItem
+        fields = ['id', 'short_uuid', 'created_at', 'is_complete', 'image_count', 'snippet', 'rank']
+        read_only_fields = fields
+
+    def get_snippet(self, obj):
+        return (
+            escape(obj.snippet)
+            .replace(HIGHLIGHT_START, '<mark>')
+            .replace(HIGHLIGHT_STOP, '</mark>')
+        )
 
 
 class ImageUploadSerializer(serializers.Serializer):
@@ -44,9 +93,14 @@ class ImageUploadSerializer(serializers.Serializer):
     - MIME type verification (magic bytes)
     - Image integrity (can be opened by Pillow)
     - Image dimensions (max 50 megapixels)
+
+    The child is a plain FileField: validate_image_file already opens the
+    image with Pillow, so ImageField's own decode-and-verify pass would
+    only repeat that work. Files are validated in parallel; errors are
+    still reported per file index.
     """
-    images = serializers.ListField(
-        child=serializers.ImageField(
+    images = ParallelListField(
+        child=serializers.FileField(
             allow_empty_file=False,
             validators=[validate_image_file]
         ),
@@ -66,3 +120,60 @@ class ImageReorderSerializer(serializers.Serializer):
         allow_empty=False,
         help_text="Array of image UUIDs in desired order"
     )
+
+
+class ImageMoveSerializer(serializers.Serializer):
+    """
+    Serializer for moving a single image within a capture.
+    Places 'image' directly before 'before', or at the end when 'before' is null.
+    """
+    image = serializers.UUIDField(help_text="UUID of the image to move")
+    before = serializers.UUIDField(
+        required=False,
+        allow_null=True,
+        default=None,
+        help_text="UUID of the image to place it before (null moves it to the end)"
+    )
+
+
+class TranscriptOpSerializer(serializers.Serializer):
+    """
+    A single text edit: delete `delete` characters at `offset`, then insert `insert` there.
+    Offsets count Unicode code points.
+    """
+    offset = serializers.IntegerField(min_value=0)
+    delete = serializers.IntegerField(min_value=0, default=0)
+    insert = serializers.CharField(allow_blank=True, trim_whitespace=False, default='')
+
+
+class TranscriptDeltaSerializer(serializers.Serializer):
+    """
+    Serializer for delta edits to a capture's voice_transcript.
+    Ops are applied in order against the transcript at 'revision'.
+    """
+    revision = serializers.IntegerField(min_value=0, help_text="Revision the edits were made against")
+    ops = TranscriptOpSerializer(many=True, allow_empty=False)
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for resumable upload sessions.
+
+    POST declares the file name and total size; offset reports how many
+    bytes the server has received so far.
+    """
+    size = serializers.IntegerField(min_value=1, max_value=MAX_FILE_SIZE)
+
+    class Meta:
+        model = UploadSession
+        fields = ['short_uuid', 'filename', 'size', 'offset', 'created_at']
+        read_only_fields = ['short_uuid', 'offset', 'created_at']
+
+    def validate_filename(self, value):
+        ext = os.path.splitext(value)[1].lower()
+        if ext not in ALLOWED_EXTENSIONS:
+            raise serializers.ValidationError(
+                f'Unsupported file extension: {ext}. '
+                f'Allowed extensions: {", ".join(ALLOWED_EXTENSIONS)}'
+            )
+        return value
@@ -1,7 +1,7 @@
 """
 Custom throttle classes for the captures API.
 """
-from rest_framework.throttling import UserRateThrottle
+from core.throttling import UserRateThrottle
 
 
 class ImageUploadThrottle(UserRateThrottle):
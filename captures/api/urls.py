@@ -4,7 +4,7 @@ URL routing for captures API endpoints.
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested import routers
-from .views import CapturedItemViewSet, CapturedImageViewSet
+from .views import CapturedItemViewSet, CapturedImageViewSet, UploadSessionViewSet
 
 # Main router for captures
 router = DefaultRouter()
@@ -14,6 +14,8 @@ router.register(r'items', CapturedItemViewSet, basename='captureditem')
 # URL pattern: /api/captures/items/{capture_short_uuid}/images/{image_short_uuid}/
 images_router = routers.NestedSimpleRouter(router, r'items', lookup='capture')
 images_router.register(r'images', CapturedImageViewSet, basename='captureditem-images')
+# URL pattern: /api/captures/items/{capture_short_uuid}/uploads/{session_short_uuid}/
+images_router.register(r'uploads', UploadSessionViewSet, basename='captureditem-uploads')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,37 +1,82 @@
 """
 API views for the captures app.
 """
-from django.db import transaction
-from django.db.models import Max
-from django.http import HttpResponse
-from rest_framework import viewsets, status
+import hashlib
+import os
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files import File
+from django.db import connection, transaction
+from django.db.models import F, Max
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from captures.models import CapturedItem, CapturedImage
+from captures.cache import ResponseCache
+from captures.events import event_stream, publish, streams_supported
+from captures.models import (
+    CapturedItem,
+    CapturedImage,
+    ImageLimitExceeded,
+    InvalidTranscriptDelta,
+    MAX_IMAGES_PER_CAPTURE,
+    TranscriptConflict,
+    UploadSession,
+)
+from captures.transcripts import (
+    flush_transcript,
+    stage_transcript,
+    write_behind_enabled,
+)
+from captures.uploadhandlers import get_upload_rejection, image_upload_handlers
+from captures.validators import inspect_image_file
 from .serializers import (
     CapturedItemSerializer,
     CapturedImageSerializer,
+    CaptureSearchSerializer,
+    CaptureSearchResultSerializer,
     ImageUploadSerializer,
     ImageReorderSerializer,
+    ImageMoveSerializer,
+    TranscriptDeltaSerializer,
+    UploadSessionSerializer,
 )
+from .asyncviews import AsyncViewSetMixin
+from .pagination import CaptureCursorPagination
+from .renderers import EventStreamRenderer
 from .throttles import ImageUploadThrottle
 
 
-class CapturedItemViewSet(viewsets.ModelViewSet):
+SAVED_HTML = '<span style="color: var(--nord14); font-size: 0.875rem;">Saved ✓</span>'
+
+
+class CapturedItemViewSet(AsyncViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet for CapturedItem.
 
     - POST creates an empty capture with owner=request.user
-    - GET /{short_uuid}/ returns capture with nested images
+    - GET /{short_uuid}/ returns capture with nested images (supports ETag / 304)
     - PATCH /{short_uuid}/ updates voice_transcript
     - DELETE /{short_uuid}/ deletes capture (cascades to images)
     - Returns user's own captures only (via queryset filtering)
+    - GET /?pagination=cursor switches the list to keyset pagination
+    - List and detail responses are cached per user (see captures.cache)
+    - Transcript-only writes can be buffered and flushed later (see captures.transcripts)
+    - list and retrieve are async (see AsyncViewSetMixin); writes run in a thread
 
     Custom actions:
     - POST /{short_uuid}/upload_images/ - Upload one or more images
     - PATCH /{short_uuid}/reorder/ - Reorder images
+    - PATCH /{short_uuid}/move/ - Move one image before another
+    - PATCH /{short_uuid}/transcript/ - Apply text deltas to voice_transcript
     - POST /{short_uuid}/complete/ - Mark capture as complete
+    - GET /{short_uuid}/events/ - Live changes to one capture (SSE)
+    - GET /events/ - Live changes to all of the user's captures (SSE)
     """
     serializer_class = CapturedItemSerializer
     permission_classes = [IsAuthenticated]
@@ -39,12 +84,128 @@ class CapturedItemViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Return only captures owned by the current user."""
-        return CapturedItem.objects.for_user(self.request.user).prefetch_related('images')
+        queryset = CapturedItem.objects.for_user(self.request.user)
+        # Image actions query images themselves; only prefetch when serializing the capture
+        if self.action in ('list', 'retrieve', 'update', 'partial_update'):
+            queryset = queryset.prefetch_related('images')
+        return queryset
+
+    def initialize_request(self, request, *args, **kwargs):
+        """
+        Install streaming image upload handlers for upload_images.
+
+        Must happen before anything reads the body, including the CSRF
+        check in SessionAuthentication, so it is done here rather than
+        in the action itself.
+        """
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        if self.action == 'upload_images':
+            request.upload_handlers = image_upload_handlers(request)
+        return drf_request
+
+    @property
+    def paginator(self):
+        """Use keyset pagination for the list when the client asks for it."""
+        if not hasattr(self, '_paginator'):
+            if CaptureCursorPagination.is_requested(self.request):
+                self._paginator = CaptureCursorPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    async def get_cache_validators(self):
+        """
+        Return (etag, last_modified) for the capture in the URL.
+
+        Computed from one aggregate query over the capture's and its images'
+        updated_at plus the maintained image count (so deletions change it too),
+        without loading or serializing anything.
+        """
+        row = await (
+            CapturedItem.objects.for_user(self.request.user)
+            .filter(short_uuid=self.kwargs['short_uuid'])
+            .annotate(images_updated=Max('images__updated_at'))
+            .values_list('updated_at', 'images_updated', 'image_count')
+            .afirst()
+        )
+        if row is None:
+            raise Http404
+        updated_at, images_updated, image_count = row
+
+        last_modified = max(filter(None, [updated_at, images_updated]))
+        # The rendered body differs per format (JSON vs browsable API)
+        fingerprint = f'{updated_at.isoformat()}:{images_updated}:{image_count}:{self.request.accepted_renderer.format}'
+        etag = quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+        return etag, last_modified
+
+    async def list(self, request, *args, **kwargs):
+        """Return the user's captures, served from the response cache when possible."""
+        response_cache = ResponseCache(request)
+        data = await response_cache.aget()
+        if data is not None:
+            return Response(data)
+
+        # Pagination and serialization query lazily; run them in a thread
+        response = await sync_to_async(super().list)(request, *args, **kwargs)
+        await response_cache.aset(response.data)
+        return response
+
+    async def retrieve(self, request, *args, **kwargs):
+        """
+        Return the capture, or 304 Not Modified if the client's copy is current.
+
+        Honors If-None-Match and If-Modified-Since; the serializer only runs
+        when the capture or its images have changed. Cached responses carry
+        their validators, so a cache hit needs no database query at all.
+        """
+        if write_behind_enabled():
+            # Serve the latest acknowledged transcript, not the last flushed one
+            await sync_to_async(flush_transcript)(kwargs['short_uuid'], owner_id=request.user.pk)
+
+        response_cache = ResponseCache(request)
+        cached = await response_cache.aget()
+        if cached is not None:
+            etag, last_modified_ts, data = cached
+        else:
+            etag, last_modified = await self.get_cache_validators()
+            last_modified_ts = int(last_modified.timestamp())
+            data = None
+
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified_ts
+        )
+        if not_modified is not None:
+            return not_modified
+
+        if data is None:
+            # Images are prefetched by aget(), so serializing needs no queries
+            data = self.get_serializer(await self.aget_object()).data
+            await response_cache.aset((etag, last_modified_ts, data))
+
+        response = Response(data)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified_ts)
+        return response
 
     def perform_create(self, serializer):
         """Set owner to current user on create."""
         serializer.save(owner=self.request.user)
 
+    def perform_update(self, serializer):
+        """Bump the transcript revision when a full PATCH replaces the transcript."""
+        if 'voice_transcript' not in serializer.validated_data:
+            instance = serializer.save()
+        else:
+            instance = serializer.save(transcript_revision=F('transcript_revision') + 1)
+            instance.refresh_from_db(fields=['transcript_revision'])
+            publish_transcript(instance)
+        if serializer.validated_data.get('is_complete'):
+            publish(instance.owner_id, instance.short_uuid, 'completed')
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        publish(instance.owner_id, instance.short_uuid, 'deleted')
+
     def update(self, request, *args, **kwargs):
         """
         Override update to handle HTMX requests.
@@ -53,6 +214,9 @@ class CapturedItemViewSet(viewsets.ModelViewSet):
         For standard API requests, returns JSON as usual.
         """
         partial = kwargs.pop('partial', False)
+        if write_behind_enabled():
+            # A direct write must not be overtaken by an older buffered one
+            flush_transcript(kwargs['short_uuid'], owner_id=request.user.pk)
         instance = self.get_object()
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
@@ -61,10 +225,7 @@ class CapturedItemViewSet(viewsets.ModelViewSet):
         # Check if this is an HTMX request
         if request.headers.get('HX-Request'):
             # Return a simple HTML response for HTMX
-            return HttpResponse(
-                '<span style="color: var(--nord14); font-size: 0.875rem;">Saved ✓</span>',
-                status=200
-            )
+            return HttpResponse(SAVED_HTML, status=200)
 
         # Standard DRF response for API clients
         if getattr(instance, '_prefetched_objects_cache', None):
@@ -72,10 +233,55 @@ class CapturedItemViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     def partial_update(self, request, *args, **kwargs):
-        """Handle PATCH requests (partial updates)."""
+        """
+        Handle PATCH requests (partial updates).
+
+        With write-behind enabled, a PATCH of voice_transcript alone is
+        buffered and acknowledged with 202 instead of updating the row.
+        """
+        if write_behind_enabled() and set(request.data.keys()) == {'voice_transcript'}:
+            return self.buffer_transcript(request, kwargs['short_uuid'])
         kwargs['partial'] = True
         return self.update(request, *args, **kwargs)
 
+    def get_transcript(self, short_uuid, lock=False):
+        """
+        Return the capture with just the transcript fields loaded.
+
+        With lock=True the row is locked, so the call must be inside a
+        transaction.
+        """
+        queryset = self.get_queryset().only(
+            'id', 'owner_id', 'short_uuid', 'voice_transcript', 'transcript_revision'
+        )
+        if lock:
+            queryset = queryset.select_for_update()
+        return get_object_or_404(queryset, short_uuid=short_uuid)
+
+    def buffer_transcript(self, request, short_uuid):
+        """Buffer a full voice_transcript replacement (write-behind mode)."""
+        serializer = self.get_serializer(data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+
+        def replace(capture):
+            capture.voice_transcript = serializer.validated_data['voice_transcript']
+            capture.transcript_revision += 1
+
+        capture = self.get_transcript(short_uuid)
+        stage_transcript(capture, replace)
+        publish_transcript(capture)
+
+        if request.headers.get('HX-Request'):
+            return HttpResponse(SAVED_HTML, status=status.HTTP_202_ACCEPTED)
+        return Response(
+            {
+                'short_uuid': capture.short_uuid,
+                'voice_transcript': capture.voice_transcript,
+                'transcript_revision': capture.transcript_revision,
+            },
+            status=status.HTTP_202_ACCEPTED
+        )
+
     @action(detail=True, methods=['post'], url_path='upload_images', throttle_classes=[ImageUploadThrottle])
     def upload_images(self, request, short_uuid=None):
         """
@@ -83,47 +289,40 @@ class CapturedItemViewSet(viewsets.ModelViewSet):
 
         Enforces 20-image limit per capture.
         Auto-assigns order by appending to the end.
+        All images are written with a single multi-row INSERT.
+        Bad signatures and oversized files are rejected while streaming.
         Returns array of created images.
 
         Rate limited: 100/hour (production), 1000/hour (development)
         """
         capture = self.get_object()
 
-        # Check current image count
-        current_count = capture.images.count()
+        # Files that failed the streaming checks were never fully read
+        data = request.data
+        rejection = get_upload_rejection(request)
+        if rejection is not None:
+            return Response({'error': str(rejection)}, status=rejection.status_code)
 
         # Validate upload using serializer
-        serializer = ImageUploadSerializer(data=request.data)
+        serializer = ImageUploadSerializer(data=data)
         serializer.is_valid(raise_exception=True)
 
         images_to_upload = serializer.validated_data['images']
-        new_count = len(images_to_upload)
 
-        # Enforce 20-image limit
-        if current_count + new_count > 20:
+        # Reserve an order range and insert all rows in one statement
+        try:
+            created_images = CapturedImage.objects.bulk_append(capture, images_to_upload)
+        except ImageLimitExceeded as e:
             return Response(
                 {
-                    'error': f'Cannot upload {new_count} images. Capture already has {current_count} images. Maximum is 20.',
-                    'current_count': current_count,
-                    'max_allowed': 20
+                    'error': str(e),
+                    'current_count': e.current_count,
+                    'max_allowed': MAX_IMAGES_PER_CAPTURE
                 },
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Get current max order
-        max_order_result = capture.images.aggregate(max=Max('order'))
-        max_order = max_order_result['max'] if max_order_result['max'] is not None else -1
-
-        # Create images with auto-incrementing order
-        created_images = []
-        for i, image_file in enumerate(images_to_upload):
-            image = CapturedImage.objects.create(
-                owner=request.user,
-                captured_item=capture,
-                image=image_file,
-                order=max_order + 1 + i
-            )
-            created_images.append(image)
+        publish_images_added(capture, created_images)
 
         # Serialize and return created images
         response_serializer = CapturedImageSerializer(created_images, many=True)
@@ -135,7 +334,8 @@ class CapturedItemViewSet(viewsets.ModelViewSet):
         Reorder images within a capture.
 
         Accepts JSON body: {"order": ["uuid1", "uuid2", "uuid3"]}
-        Updates order field on each image in a transaction.
+        Validates ownership with one query and writes the new order
+        with a single UPDATE.
         """
         capture = self.get_object()
 
@@ -145,8 +345,11 @@ class CapturedItemViewSet(viewsets.ModelViewSet):
 
         ordered_uuids = serializer.validated_data['order']
 
-        # Get all images for this capture, keyed by uuid (not id or short_uuid)
-        images = {img.uuid: img for img in capture.images.all()}
+        # Validate ownership and load the affected rows in one query
+        images = {
+            img.uuid: img
+            for img in capture.images.filter(uuid__in=ordered_uuids).only('id', 'uuid', 'short_uuid', 'order')
+        }
 
         # Validate that all provided UUIDs belong to this capture
         for uuid in ordered_uuids:
@@ -156,37 +359,211 @@ class CapturedItemViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-        # Update order in a transaction
-        with transaction.atomic():
-            for new_order, uuid in enumerate(ordered_uuids):
-                image = images[uuid]
-                image.order = new_order
-                image.save(update_fields=['order'])
+        # Apply the whole permutation in a single UPDATE
+        ordered = [images[uuid] for uuid in ordered_uuids]
+        if CapturedImage.objects.apply_order(capture, ordered):
+            publish_reordered(capture, ordered)
 
         return Response({'reordered': True, 'count': len(ordered_uuids)})
 
+    @action(detail=True, methods=['patch'])
+    def move(self, request, short_uuid=None):
+        """
+        Move a single image before another one.
+
+        Accepts JSON body: {"image": "uuid1", "before": "uuid2"}
+        Omit "before" (or pass null) to move the image to the end.
+        Only rows whose position changes are updated.
+        """
+        capture = self.get_object()
+
+        serializer = ImageMoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        image_uuid = serializer.validated_data['image']
+        before_uuid = serializer.validated_data['before']
+
+        images = list(capture.images.only('id', 'uuid', 'short_uuid', 'order'))
+        by_uuid = {img.uuid: img for img in images}
+
+        for uuid in (image_uuid, before_uuid):
+            if uuid is not None and uuid not in by_uuid:
+                return Response(
+                    {'error': f'Image {uuid} does not belong to this capture'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        moving = by_uuid[image_uuid]
+        if before_uuid != image_uuid:
+            images.remove(moving)
+            if before_uuid is None:
+                images.append(moving)
+            else:
+                images.insert(images.index(by_uuid[before_uuid]), moving)
+
+        moved = CapturedImage.objects.apply_order(capture, images)
+        if moved:
+            publish_reordered(capture, images)
+
+        return Response({'moved': True, 'count': len(moved)})
+
+    @action(detail=True, methods=['patch'])
+    def transcript(self, request, short_uuid=None):
+        """
+        Apply text deltas to the voice transcript.
+
+        Accepts JSON body:
+            {"revision": 7, "ops": [{"offset": 120, "delete": 0, "insert": "more words"}]}
+        The ops must have been made against `revision`; if the transcript has
+        moved on since (e.g. an edit from another device), nothing is applied
+        and 409 is returned with the current revision so the client can resync.
+        Returns the new revision and transcript length; 202 when the edit was
+        buffered by write-behind mode rather than saved.
+        """
+        serializer = TranscriptDeltaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        buffered = write_behind_enabled()
+
+        def apply_delta(capture):
+            capture.apply_transcript_delta(
+                serializer.validated_data['revision'],
+                serializer.validated_data['ops'],
+                save=not buffered
+            )
+
+        try:
+            if buffered:
+                capture = self.get_transcript(short_uuid)
+                stage_transcript(capture, apply_delta)
+            else:
+                with transaction.atomic():
+                    # Lock the capture so concurrent deltas apply one at a time
+                    capture = self.get_transcript(short_uuid, lock=True)
+                    apply_delta(capture)
+        except TranscriptConflict as e:
+            return Response(
+                {'error': str(e), 'revision': e.current_revision},
+                status=status.HTTP_409_CONFLICT
+            )
+        except InvalidTranscriptDelta as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        publish_transcript(capture)
+
+        return Response(
+            {
+                'revision': capture.transcript_revision,
+                'length': len(capture.voice_transcript)
+            },
+            status=status.HTTP_202_ACCEPTED if buffered else status.HTTP_200_OK
+        )
+
     @action(detail=True, methods=['post'])
     def complete(self, request, short_uuid=None):
         """
         Mark a capture as complete.
 
         Sets is_complete=True and returns completion status with image count.
+        Any buffered transcript is saved first.
         """
+        if write_behind_enabled():
+            flush_transcript(short_uuid, owner_id=request.user.pk)
         capture = self.get_object()
         capture.is_complete = True
-        capture.save(update_fields=['is_complete'])
+        capture.save(update_fields=['is_complete', 'updated_at'])
+        publish(capture.owner_id, capture.short_uuid, 'completed')
 
         return Response({
             'completed': True,
-            'image_count': capture.images.count()
+            'image_count': capture.image_count
         })
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Search the user's transcripts.
+
+        Query params: q (websearch syntax on PostgreSQL: words, "phrases",
+        -excluded, or) and limit (default 20, max 50). Results are ranked
+        best first with a highlighted snippet. Buffered (not yet flushed)
+        transcript edits are not searchable until they are saved.
+        """
+        params = CaptureSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        results = (
+            CapturedItem.objects.for_user(request.user)
+            .search(params.validated_data['q'])
+            .defer('voice_transcript', 'search_vector')
+            [:params.validated_data['limit']]
+        )
+        serializer = CaptureSearchResultSerializer(results, many=True, context=self.get_serializer_context())
+        return Response({'results': serializer.data})
+
+    @action(detail=True, methods=['get'], renderer_classes=[EventStreamRenderer])
+    async def events(self, request, short_uuid=None):
+        """
+        Stream live changes to this capture as Server-Sent Events.
+
+        Event types: transcript, images_added, image_deleted,
+        images_reordered, completed, deleted. See captures.events.
+        """
+        # Ownership check; the stream itself never touches the database
+        await self.aget_object()
+        return await event_stream_response(request, event_stream(request.user.pk, capture=short_uuid))
+
+    @action(detail=False, methods=['get'], url_path='events', url_name='inbox-events',
+            renderer_classes=[EventStreamRenderer])
+    async def inbox(self, request):
+        """Stream live changes to all of the user's captures as Server-Sent Events."""
+        return await event_stream_response(request, event_stream(request.user.pk))
+
+
+async def event_stream_response(request, stream):
+    if not streams_supported(request._request):
+        # 204 tells EventSource to stop reconnecting
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    # Django would hold this request's database connection until the stream
+    # ends; hand it back now, from the request's sync thread that owns it
+    await sync_to_async(release_connection)()
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Don't let nginx buffer the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def release_connection():
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+def publish_transcript(capture):
+    publish(
+        capture.owner_id, capture.short_uuid, 'transcript',
+        revision=capture.transcript_revision,
+        voice_transcript=capture.voice_transcript,
+    )
+
+
+def publish_images_added(capture, images):
+    publish(
+        capture.owner_id, capture.short_uuid, 'images_added',
+        images=[image.short_uuid for image in images],
+    )
 
-class CapturedImageViewSet(viewsets.ModelViewSet):
+
+def publish_reordered(capture, images):
+    publish(
+        capture.owner_id, capture.short_uuid, 'images_reordered',
+        order=[image.short_uuid for image in images],
+    )
+
+
+class CapturedImageViewSet(AsyncViewSetMixin, viewsets.ModelViewSet):
     """
     ViewSet for CapturedImage.
 
-    Provides deletion of individual images.
+    Provides deletion of individual images (async).
     All operations are scoped to the current user's captures.
     """
     serializer_class = CapturedImageSerializer
@@ -204,3 +581,180 @@ class CapturedImageViewSet(viewsets.ModelViewSet):
             owner=self.request.user,
             captured_item__short_uuid=capture_uuid
         )
+
+    async def destroy(self, request, *args, **kwargs):
+        """Delete the image; signal receivers run in a thread via adelete()."""
+        image = await self.aget_object()
+        await image.adelete()
+        await sync_to_async(publish)(
+            image.owner_id, self.kwargs['capture_short_uuid'], 'image_deleted', image=image.short_uuid
+        )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin,
+                           mixins.RetrieveModelMixin,
+                           mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """
+    ViewSet for resumable, chunked image uploads.
+
+    - POST / with {"filename", "size"} creates a session
+    - GET /{short_uuid}/ returns the current offset (resume point)
+    - PUT /{short_uuid}/ with a raw body and Upload-Offset header appends a chunk
+    - POST /{short_uuid}/finalize/ validates the file and adds it to the capture
+    - DELETE /{short_uuid}/ abandons the session
+
+    Each request is short and independently retryable, so a dropped
+    connection only costs the chunk in flight.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+    lookup_field = 'short_uuid'
+
+    def get_queryset(self):
+        """
+        Return only sessions owned by the current user for the capture in the URL.
+        """
+        return UploadSession.objects.filter(
+            owner=self.request.user,
+            captured_item__short_uuid=self.kwargs.get('capture_short_uuid')
+        )
+
+    def get_throttles(self):
+        """Count session creation against the upload rate, not every chunk."""
+        if self.action == 'create':
+            return [ImageUploadThrottle()]
+        return super().get_throttles()
+
+    def perform_create(self, serializer):
+        """Attach the session to the capture and create an empty temp file."""
+        capture = get_object_or_404(
+            CapturedItem.objects.for_user(self.request.user),
+            short_uuid=self.kwargs.get('capture_short_uuid')
+        )
+        session = serializer.save(owner=self.request.user, captured_item=capture)
+        os.makedirs(settings.CAPTURES_UPLOAD_TEMP_DIR, exist_ok=True)
+        open(session.temp_path, 'wb').close()
+
+    def perform_destroy(self, instance):
+        instance.discard_temp_file()
+        instance.delete()
+
+    def update(self, request, *args, **kwargs):
+        """
+        Append a chunk.
+
+        The raw request body is the chunk; the Upload-Offset header must equal
+        the session's current offset. Returns 409 with the current offset if
+        it doesn't (e.g. a retried chunk that was already stored).
+        """
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return Response(
+                {'error': 'Upload-Offset and Content-Length headers are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if length > settings.CAPTURES_UPLOAD_MAX_CHUNK_SIZE:
+            return Response(
+                {
+                    'error': 'Chunk too large',
+                    'max_chunk_size': settings.CAPTURES_UPLOAD_MAX_CHUNK_SIZE
+                },
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+
+        with transaction.atomic():
+            # Lock the session so concurrent retries can't interleave writes
+            session = get_object_or_404(
+                self.get_queryset().select_for_update(),
+                short_uuid=kwargs['short_uuid']
+            )
+
+            if offset != session.offset:
+                return Response(
+                    {'error': 'Offset mismatch', 'offset': session.offset},
+                    status=status.HTTP_409_CONFLICT
+                )
+            if offset + length > session.size:
+                return Response(
+                    {'error': 'Chunk exceeds declared size', 'offset': session.offset},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
+
+            # Stream the body to disk; overwrite anything past the committed
+            # offset left behind by an interrupted earlier attempt
+            written = 0
+            with open(session.temp_path, 'r+b') as fh:
+                fh.seek(offset)
+                while written < length:
+                    block = request._request.read(min(64 * 1024, length - written))
+                    if not block:
+                        break
+                    fh.write(block)
+                    written += len(block)
+                fh.truncate()
+
+            if written != length:
+                return Response(
+                    {'error': 'Incomplete chunk', 'offset': session.offset},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            session.offset = offset + written
+            session.save(update_fields=['offset', 'updated_at'])
+
+        return Response({'offset': session.offset, 'size': session.size})
+
+    @action(detail=True, methods=['post'])
+    def finalize(self, request, short_uuid=None, capture_short_uuid=None):
+        """
+        Validate the assembled file and add it to the capture.
+
+        Runs the same validation and bulk insert path as upload_images.
+        Returns the created image, like upload_images does.
+        """
+        with transaction.atomic():
+            # Lock the session so concurrent finalize calls can't both add the
+            # image; the loser finds the session gone once the winner commits
+            session = get_object_or_404(
+                self.get_queryset().select_for_update(),
+                short_uuid=short_uuid
+            )
+
+            if not session.is_complete:
+                return Response(
+                    {'error': 'Upload is incomplete', 'offset': session.offset, 'size': session.size},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            with open(session.temp_path, 'rb') as fh:
+                upload = File(fh, name=session.filename)
+                try:
+                    inspect_image_file(upload)
+                except DjangoValidationError as e:
+                    session.delete()
+                    transaction.on_commit(session.discard_temp_file)
+                    return Response({'error': e.messages}, status=status.HTTP_400_BAD_REQUEST)
+
+                try:
+                    created_images = CapturedImage.objects.bulk_append(session.captured_item, [upload])
+                except ImageLimitExceeded as e:
+                    return Response(
+                        {
+                            'error': str(e),
+                            'current_count': e.current_count,
+                            'max_allowed': MAX_IMAGES_PER_CAPTURE
+                        },
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+            session.delete()
+            transaction.on_commit(session.discard_temp_file)
+            publish_images_added(session.captured_item, created_images)
+
+        response_serializer = CapturedImageSerializer(created_images[0])
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CapturesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'captures'
+
+    def ready(self):
+        from captures import signals  # noqa: F401
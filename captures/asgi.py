@@ -0,0 +1,142 @@
+"""
+ASGI middleware for the captures app.
+
+UploadLimitMiddleware enforces upload size limits before the body is
+read, and EventStreamDisconnectMiddleware ends live event streams when
+their client goes away.
+
+Under WSGI, captures.uploadhandlers rejects oversized uploads while the
+body is still streaming in. Django's ASGIHandler instead receives the
+whole body (spooled to memory or a temp file) before any upload handler
+or view runs, so UploadLimitMiddleware enforces the size limits at the
+ASGI layer: a declared Content-Length over the limit is refused with 413
+without reading the body, and a body that grows past the limit without
+declaring its length is cut off at the limit.
+
+Checks that need the file's content (extension, image signature) still
+happen in the upload handlers, but under ASGI only once the (size-bounded)
+body has arrived.
+"""
+
+import asyncio
+import json
+from django.conf import settings
+from django.urls import Resolver404, resolve
+from captures.uploadhandlers import MAX_REQUEST_SIZE
+
+EVENT_STREAM_URL_NAMES = {'captureditem-events', 'captureditem-inbox-events'}
+
+
+def route_name(path):
+    try:
+        return resolve(path).url_name
+    except Resolver404:
+        return None
+
+
+def upload_limit(path):
+    """Return (max body size, error body) for an upload route, or None."""
+    url_name = route_name(path)
+    if url_name == 'captureditem-upload-images':
+        return MAX_REQUEST_SIZE, {
+            'error': f"Upload too large. Maximum request size is {MAX_REQUEST_SIZE // (1024*1024)}MB."
+        }
+    if url_name == 'captureditem-uploads-detail':
+        max_chunk_size = settings.CAPTURES_UPLOAD_MAX_CHUNK_SIZE
+        return max_chunk_size, {'error': 'Chunk too large', 'max_chunk_size': max_chunk_size}
+    return None
+
+
+class UploadLimitMiddleware:
+    """Wraps an ASGI application; see the module docstring."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        limit = upload_limit(scope['path']) if scope['type'] == 'http' else None
+        if limit is None:
+            return await self.app(scope, receive, send)
+        max_size, error = limit
+
+        content_length = dict(scope['headers']).get(b'content-length')
+        if content_length is not None and content_length.isdigit() and int(content_length) > max_size:
+            return await self.reject(send, error)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > max_size:
+                    await self.reject(send, error)
+                    # Makes Django abandon the request without responding
+                    return {'type': 'http.disconnect'}
+            return message
+
+        return await self.app(scope, limited_receive, send)
+
+    async def reject(self, send, error):
+        body = json.dumps(error).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 413,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'connection', b'close'),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+
+class EventStreamDisconnectMiddleware:
+    """
+    Cancels an event stream's request when its client disconnects.
+
+    Django 4.2's ASGIHandler stops receiving once it has read the request
+    body, so it never sees http.disconnect, and ASGI servers need not raise
+    when a response is sent to a closed connection. An idle SSE stream
+    would therefore keep its generator and broker subscription for as long
+    as the worker lives. For event stream routes this middleware reads the
+    body on Django's behalf, then waits for http.disconnect alongside the
+    application and cancels it when one arrives; the cancellation unwinds
+    the stream's generator, which unsubscribes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or route_name(scope['path']) not in EVENT_STREAM_URL_NAMES:
+            return await self.app(scope, receive, send)
+
+        body = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body.append(message)
+            if not message.get('more_body', False):
+                break
+
+        async def replay_body():
+            # Django reads the body and nothing after it
+            return body.pop(0) if body else {'type': 'http.disconnect'}
+
+        async def wait_for_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        app_task = asyncio.ensure_future(self.app(scope, replay_body, send))
+        disconnect_task = asyncio.ensure_future(wait_for_disconnect())
+        try:
+            await asyncio.wait({app_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (app_task, disconnect_task):
+                task.cancel()
+            results = await asyncio.gather(app_task, disconnect_task, return_exceptions=True)
+        if isinstance(results[0], Exception):
+            raise results[0]
@@ -0,0 +1,117 @@
+"""
+Per-user response cache for the captures API.
+
+Rendered-ready response data for capture list and detail requests is cached
+per owner. Every key embeds the owner's current cache version, so changing
+any of the owner's captures or images invalidates all of their entries by
+replacing one value, with no key scanning.
+
+Versions are bumped after the writing transaction commits (signals in
+captures.signals, plus explicit calls from bulk code paths that bypass
+signals). Bumping on commit rather than on save means a concurrent reader
+can never cache pre-commit data under the new version.
+
+The backend is whichever Django cache CAPTURES_RESPONSE_CACHE names. In
+production that must be shared by all workers (see settings); tests use
+the in-process LocMemCache. Set it to None to disable caching.
+"""
+
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def get_response_cache():
+    """Return the configured cache, or None if response caching is disabled."""
+    alias = settings.CAPTURES_RESPONSE_CACHE
+    return caches[alias] if alias else None
+
+
+def owner_version_key(owner_id):
+    return f'captures:owner:{owner_id}:version'
+
+
+def get_owner_version(cache, owner_id):
+    """Return the owner's cache version, initializing it if missing."""
+    key = owner_version_key(owner_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses an old version
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+async def aget_owner_version(cache, owner_id):
+    """Async version of get_owner_version."""
+    key = owner_version_key(owner_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_owner_version(owner_id):
+    cache = get_response_cache()
+    if cache is None:
+        return
+    # A fresh clock value rather than incr(): backends such as FileBasedCache
+    # implement incr as get + set, so concurrent bumps could collapse into one
+    # and leave a version that pre-commit data was cached under
+    cache.set(owner_version_key(owner_id), time.time_ns(), timeout=None)
+
+
+def invalidate_owner(owner_id):
+    """Invalidate all cached responses for an owner once the transaction commits."""
+    transaction.on_commit(lambda: bump_owner_version(owner_id))
+
+
+def response_key(request, version):
+    """
+    Build the cache key for a request.
+
+    The absolute URI covers the capture, list cursor/page and host (responses
+    embed absolute URLs); the renderer format distinguishes JSON from the
+    browsable API.
+    """
+    fingerprint = f'{request.build_absolute_uri()}|{request.accepted_renderer.format}'
+    digest = hashlib.sha1(fingerprint.encode()).hexdigest()
+    return f'captures:owner:{request.user.pk}:{version}:{digest}'
+
+
+class ResponseCache:
+    """
+    Cache lookups for one request, bound to the owner's current version.
+
+    get()/set() and aget()/aset() must not be mixed on one instance.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self.cache = get_response_cache()
+        self.key = None
+
+    def get(self):
+        if self.cache is None:
+            return None
+        version = get_owner_version(self.cache, self.request.user.pk)
+        self.key = response_key(self.request, version)
+        return self.cache.get(self.key)
+
+    def set(self, value):
+        if self.cache is not None:
+            self.cache.set(self.key, value, settings.CAPTURES_RESPONSE_CACHE_TIMEOUT)
+
+    async def aget(self):
+        if self.cache is None:
+            return None
+        version = await aget_owner_version(self.cache, self.request.user.pk)
+        self.key = response_key(self.request, version)
+        return await self.cache.aget(self.key)
+
+    async def aset(self, value):
+        if self.cache is not None:
+            await self.cache.aset(self.key, value, settings.CAPTURES_RESPONSE_CACHE_TIMEOUT)
@@ -0,0 +1,185 @@
+"""
+Derivative (resized variant) generation for captured images.
+
+Originals are stored as uploaded (up to 10MB / 50MP). Pages that show
+images as tiles or previews should use a derivative instead. Variants are
+produced in the background by the process_derivatives management command,
+which drains the DerivativeJob queue table.
+"""
+
+import logging
+import math
+from datetime import timedelta
+from io import BytesIO
+from PIL import Image, ImageOps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from captures.models import CapturedImage, DerivativeJob
+
+logger = logging.getLogger(__name__)
+
+# Pillow format name -> file extension for derivative output
+FORMAT_EXTENSIONS = {
+    'WEBP': 'webp',
+    'JPEG': 'jpg',
+}
+
+
+def derivative_name(image, size_name):
+    """Return the storage path for a derivative of a CapturedImage."""
+    ext = FORMAT_EXTENSIONS[settings.CAPTURES_DERIVATIVE_FORMAT]
+    return f'derivatives/{image.short_uuid}/{size_name}.{ext}'
+
+
+def render_derivative(source, max_side):
+    """
+    Resize a decoded image to fit within max_side and encode it.
+
+    Never upscales. Returns the encoded bytes.
+    """
+    output_format = settings.CAPTURES_DERIVATIVE_FORMAT
+    variant = source.copy()
+    variant.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    if output_format == 'JPEG' and variant.mode != 'RGB':
+        variant = variant.convert('RGB')
+    elif variant.mode not in ('RGB', 'RGBA'):
+        variant = variant.convert('RGBA')
+
+    buffer = BytesIO()
+    variant.save(buffer, output_format, quality=settings.CAPTURES_DERIVATIVE_QUALITY)
+    return buffer.getvalue()
+
+
+def derivative_files(image):
+    """Return every path a derivative of the image may be stored at."""
+    names = {derivative_name(image, size_name) for size_name in settings.CAPTURES_DERIVATIVE_SIZES}
+    return names | set(image.derivatives.values())
+
+
+def generate_derivatives(image):
+    """
+    Generate every configured derivative for a CapturedImage.
+
+    The original is decoded once, JPEGs at a reduced scale that still
+    covers the largest size; each size is rendered from it and written to
+    the image's storage. The resulting paths are recorded on
+    image.derivatives, unless the image was deleted meanwhile, in which
+    case the files are removed again and None is returned.
+
+    Derivatives live in default storage under a per-image path (not
+    content-addressed), so they can be traced back to their image.
+    """
+    storage = default_storage
+    largest = max(settings.CAPTURES_DERIVATIVE_SIZES.values())
+
+    with image.image.open('rb') as f:
+        source = Image.open(f)
+        scale = largest / max(source.size)
+        if scale < 1:
+            # No-op for formats without reduced-scale decoding
+            source.draft(None, (math.ceil(source.width * scale), math.ceil(source.height * scale)))
+        # Apply EXIF orientation so phone photos are not rotated
+        source = ImageOps.exif_transpose(source)
+        source.load()
+
+    names = {}
+    for size_name, max_side in settings.CAPTURES_DERIVATIVE_SIZES.items():
+        name = derivative_name(image, size_name)
+        # Regeneration replaces the previous file instead of adding a suffix
+        if storage.exists(name):
+            storage.delete(name)
+        names[size_name] = storage.save(name, ContentFile(render_derivative(source, max_side)))
+
+    with transaction.atomic():
+        # A delete that commits after this sees the files (captures.signals);
+        # one that committed before may have cleaned up before they existed
+        if not CapturedImage.objects.select_for_update().filter(pk=image.pk).exists():
+            for name in names.values():
+                storage.delete(name)
+            return None
+        image.derivatives = names
+        image.save(update_fields=['derivatives', 'updated_at'])
+    return names
+
+
+def claim_next_job():
+    """
+    Lease the oldest available pending DerivativeJob, or return None.
+
+    The row is locked (SKIP LOCKED) just long enough to set claimed_until,
+    so several workers can drain the queue concurrently and no transaction
+    stays open while images are decoded.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            DerivativeJob.objects
+            .select_for_update(skip_locked=True)
+            .select_related('image')
+            .filter(status=DerivativeJob.PENDING)
+            .filter(Q(claimed_until__isnull=True) | Q(claimed_until__lt=now))
+            .order_by('id')
+            .first()
+        )
+        if job is not None:
+            job.claimed_until = now + timedelta(seconds=settings.CAPTURES_DERIVATIVE_CLAIM_TIMEOUT)
+            job.save(update_fields=['claimed_until'])
+    return job
+
+
+def process_next_job():
+    """
+    Claim and process one pending DerivativeJob.
+
+    Successful jobs are deleted; failures are retried until
+    CAPTURES_DERIVATIVE_MAX_ATTEMPTS, then marked failed. If the image is
+    deleted meanwhile its job goes with it, so jobs are written with
+    queryset updates that touch no missing row.
+
+    Returns False when the queue is empty.
+    """
+    job = claim_next_job()
+    if job is None:
+        return False
+
+    try:
+        generate_derivatives(job.image)
+    except Exception as e:
+        logger.exception("Derivative generation failed for image %s", job.image_id)
+        attempts = job.attempts + 1
+        DerivativeJob.objects.filter(pk=job.pk).update(
+            attempts=attempts,
+            last_error=str(e),
+            claimed_until=None,
+            status=(
+                DerivativeJob.FAILED if attempts >= settings.CAPTURES_DERIVATIVE_MAX_ATTEMPTS
+                else DerivativeJob.PENDING
+            ),
+        )
+    else:
+        DerivativeJob.objects.filter(pk=job.pk).delete()
+
+    return True
+
+
+def process_pending_jobs(limit=None):
+    """Process pending jobs until the queue is empty or limit is reached."""
+    processed = 0
+    while limit is None or processed < limit:
+        if not process_next_job():
+            break
+        processed += 1
+    return processed
+
+
+def enqueue_missing_derivatives():
+    """Queue jobs for images that have no derivatives and no pending job."""
+    images = CapturedImage.objects.filter(derivatives={}).exclude(derivative_jobs__isnull=False)
+    return len(DerivativeJob.objects.bulk_create(
+        DerivativeJob(image=image) for image in images.only('id')
+    ))
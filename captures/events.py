@@ -0,0 +1,235 @@
+"""
+Live capture events for Server-Sent Event streams.
+
+The captures API publishes small events when a capture changes (transcript
+edits, images added/deleted/reordered, completion). Open SSE streams (see
+CapturedItemViewSet.events and .inbox) subscribe to a broker and forward
+the events to the browser, so other devices update without polling.
+
+Events are published after the writing transaction commits. Each event is
+a dict: {"type": ..., "capture": <short_uuid>, "owner": <user pk>, "data": {...}}.
+
+CAPTURES_EVENT_BROKER selects the broker:
+
+- "local": in-process fan-out. Only streams served by the same process see
+  an event, so use it for a single worker (development, tests).
+- "postgres": events are sent with NOTIFY and every process LISTENs on one
+  channel, so streams on any worker see every event.
+- None: publishing is a no-op.
+
+Delivery is best effort: a stream that falls behind drops its oldest
+events, and events published while a client is reconnecting are missed.
+Clients should refetch the capture after (re)connecting.
+
+Streams are only served under ASGI (see streams_supported). A WSGI server
+collects an async response into a list before sending it, so an endless
+stream would send nothing and hold a worker thread forever.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+BROKERS = {
+    'local': 'captures.events.LocalBroker',
+    'postgres': 'captures.events.PostgresBroker',
+}
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7900
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+class Subscription:
+    """One open stream's queue of events, fed from any thread."""
+
+    def __init__(self, loop, owner_id, capture=None, maxsize=100):
+        self.loop = loop
+        self.owner_id = owner_id
+        self.capture = capture
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, event):
+        if self.capture is not None and event['capture'] != self.capture:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The stream's event loop has shut down
+            pass
+
+    def _put(self, event):
+        if self.queue.full():
+            # Slow consumer: drop the oldest event rather than block publishers
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalBroker:
+    """Fans events out to subscriptions in this process."""
+
+    def __init__(self):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        self.dispatch(event)
+
+    def dispatch(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(event['owner'], ()))
+        for subscription in subscriptions:
+            subscription.offer(event)
+
+    def subscribe(self, owner_id, capture=None):
+        """
+        Subscribe the running event loop to an owner's events, optionally
+        for one capture only. Pair with unsubscribe().
+        """
+        subscription = Subscription(asyncio.get_running_loop(), owner_id, capture)
+        with self._lock:
+            self._subscriptions[owner_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.owner_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.owner_id]
+
+
+class PostgresBroker(LocalBroker):
+    """
+    Publishes with NOTIFY; a listener thread per process dispatches
+    notifications (including its own) to local subscriptions.
+    """
+    channel = 'captures_events'
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+
+    def publish(self, event):
+        payload = json.dumps(event)
+        if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+            # Too big to NOTIFY (long transcripts); clients refetch instead
+            event = {**event, 'data': {'truncated': True}}
+            payload = json.dumps(event)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+    def subscribe(self, owner_id, capture=None):
+        self.start_listener()
+        return super().subscribe(owner_id, capture)
+
+    def start_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self.listen, name='captures-events-listener', daemon=True
+                )
+                self._listener.start()
+
+    def listen(self):
+        """Hold a dedicated LISTEN connection, reconnecting on failure."""
+        import psycopg2
+
+        while True:
+            try:
+                conn = psycopg2.connect(**connection.get_connection_params())
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self.dispatch(json.loads(notify.payload))
+            except Exception:
+                logger.exception("Capture event listener failed; reconnecting")
+                time.sleep(5)
+
+
+def streams_supported(request):
+    """Whether `request` (an HttpRequest) is served by an ASGI server that can stream events."""
+    return isinstance(request, ASGIRequest)
+
+
+def get_broker():
+    """Return the process-wide broker, or None if events are disabled."""
+    global _broker
+    name = settings.CAPTURES_EVENT_BROKER
+    if not name:
+        return None
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(BROKERS[name])()
+    return _broker
+
+
+def publish(owner_id, capture_short_uuid, event_type, **data):
+    """Publish an event about a capture once the current transaction commits."""
+    broker = get_broker()
+    if broker is None:
+        return
+    event = {
+        'type': event_type,
+        'capture': capture_short_uuid,
+        'owner': owner_id,
+        'data': data,
+    }
+    transaction.on_commit(lambda: broker.publish(event))
+
+
+def format_event(event):
+    """Render an event as an SSE message."""
+    body = json.dumps({'capture': event['capture'], **event['data']})
+    return f"event: {event['type']}\ndata: {body}\n\n"
+
+
+async def event_stream(owner_id, capture=None):
+    """
+    Yield SSE messages for an owner (or one of their captures) until the
+    client goes away, which captures.asgi.EventStreamDisconnectMiddleware
+    turns into a cancellation. Comment lines keep idle connections (and
+    proxies in between) from timing out.
+    """
+    broker = get_broker()
+    if broker is None:
+        yield 'retry: 3000\n\n'
+        return
+    subscription = broker.subscribe(owner_id, capture)
+    try:
+        # Sent once subscribed: tells EventSource how soon to reconnect and
+        # gets headers to the client immediately
+        yield 'retry: 3000\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(), timeout=settings.CAPTURES_EVENT_KEEPALIVE
+                )
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,35 @@
+"""
+Remove abandoned resumable upload sessions and their partial files.
+
+Usage:
+    python manage.py cleanup_upload_sessions               # older than 24 hours
+    python manage.py cleanup_upload_sessions --hours 6
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from captures.models import UploadSession
+
+
+class Command(BaseCommand):
+    help = 'Delete upload sessions that have not received data recently'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=float,
+            default=24,
+            help='Delete sessions idle for longer than this many hours (default: 24)'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options['hours'])
+        stale = UploadSession.objects.filter(updated_at__lt=cutoff)
+
+        count = 0
+        for session in stale.iterator():
+            session.discard_temp_file()
+            session.delete()
+            count += 1
+
+        self.stdout.write(f'Removed {count} stale upload session(s)')
@@ -0,0 +1,53 @@
+"""
+Background sweeper that saves buffered transcripts their timers missed.
+
+Usage:
+    python manage.py flush_transcripts                # run forever
+    python manage.py flush_transcripts --once         # sweep once and exit
+    python manage.py flush_transcripts --min-age 60   # leave younger edits to their timers
+"""
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from captures.transcripts import get_transcript_buffer, sweep_transcripts
+
+
+class Command(BaseCommand):
+    help = 'Flush write-behind transcripts left in the buffer cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Sweep the buffer once, then exit'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10.0,
+            help='Seconds to wait between sweeps (default: 10)'
+        )
+        parser.add_argument(
+            '--min-age',
+            type=float,
+            default=30.0,
+            help='Only flush edits staged at least this many seconds ago (default: 30)'
+        )
+
+    def handle(self, *args, **options):
+        if not hasattr(get_transcript_buffer(), 'values'):
+            raise CommandError(
+                f'Cache "{settings.CAPTURES_TRANSCRIPT_BUFFER_CACHE}" cannot list its entries; '
+                'use core.cache.DurableFileBasedCache for CAPTURES_TRANSCRIPT_BUFFER_CACHE.'
+            )
+
+        while True:
+            written = sweep_transcripts(options['min_age'])
+            if written:
+                self.stdout.write(f'Flushed {written} transcript(s)')
+            if options['once']:
+                break
+            # Drop connections that went stale while idle
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,49 @@
+"""
+Background worker that generates image derivatives.
+
+Usage:
+    python manage.py process_derivatives            # run forever
+    python manage.py process_derivatives --once     # drain the queue and exit
+    python manage.py process_derivatives --backfill # queue images missing derivatives
+"""
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from captures.derivatives import enqueue_missing_derivatives, process_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Generate resized image variants from the DerivativeJob queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process the queue until empty, then exit'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between polls when the queue is empty (default: 2)'
+        )
+        parser.add_argument(
+            '--backfill',
+            action='store_true',
+            help='Queue jobs for existing images without derivatives before processing'
+        )
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            queued = enqueue_missing_derivatives()
+            self.stdout.write(f'Queued {queued} image(s) for derivative generation')
+
+        while True:
+            processed = process_pending_jobs()
+            if processed:
+                self.stdout.write(f'Processed {processed} derivative job(s)')
+            if options['once']:
+                break
+            # Drop connections that went stale while idle
+            close_old_connections()
+            time.sleep(options['interval'])
@@ -0,0 +1,76 @@
+"""
+Repair drift in the denormalized image counters on CapturedItem.
+
+image_count and next_order are maintained incrementally; this recomputes
+them from the images table and fixes any capture that disagrees.
+
+Usage:
+    python manage.py reconcile_image_counts
+    python manage.py reconcile_image_counts --dry-run
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max
+from captures.cache import invalidate_owner
+from captures.models import CapturedImage, CapturedItem
+
+
+class Command(BaseCommand):
+    help = 'Recompute image_count and next_order for captures whose counters have drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drifted captures without fixing them'
+        )
+
+    def handle(self, *args, **options):
+        actual = {
+            row['captured_item']: row
+            for row in CapturedImage.objects.order_by().values('captured_item').annotate(
+                count=Count('id'),
+                max_order=Max('order'),
+            )
+        }
+
+        fixed = 0
+        captures = CapturedItem.objects.only('id', 'owner_id', 'short_uuid', 'image_count', 'next_order')
+        for capture in captures.iterator():
+            expected = self.expected_counters(capture, actual.get(capture.pk))
+            if (capture.image_count, capture.next_order) == expected:
+                continue
+
+            if not options['dry_run']:
+                # Recompute under the same lock uploads take, so a concurrent
+                # append between the scan and the fix is not overwritten
+                with transaction.atomic():
+                    capture = CapturedItem.objects.select_for_update().only(
+                        'id', 'owner_id', 'short_uuid', 'image_count', 'next_order'
+                    ).get(pk=capture.pk)
+                    row = capture.images.order_by().aggregate(count=Count('id'), max_order=Max('order'))
+                    expected = self.expected_counters(capture, row if row['count'] else None)
+                    if (capture.image_count, capture.next_order) == expected:
+                        continue
+                    CapturedItem.objects.filter(pk=capture.pk).update(
+                        image_count=expected[0],
+                        next_order=expected[1],
+                    )
+                    invalidate_owner(capture.owner_id)
+
+            self.stdout.write(
+                f'Capture {capture.short_uuid}: image_count {capture.image_count} -> {expected[0]}, '
+                f'next_order {capture.next_order} -> {expected[1]}'
+            )
+            fixed += 1
+
+        verb = 'Found' if options['dry_run'] else 'Reconciled'
+        self.stdout.write(f'{verb} {fixed} capture(s) with drifted counters')
+
+    @staticmethod
+    def expected_counters(capture, row):
+        """Return the correct (image_count, next_order) given the images aggregate row."""
+        if row is None:
+            return 0, capture.next_order
+        # next_order may run ahead of the images after deletes; it must only never lag
+        return row['count'], max(capture.next_order, row['max_order'] + 1)
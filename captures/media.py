@@ -0,0 +1,131 @@
+"""
+Authorized serving of captured image files.
+
+Media URLs (MEDIA_URL + file name) are routed to Django, which checks that
+the requesting user owns an image using the file, then:
+
+- with CAPTURES_MEDIA_ACCEL_REDIRECT set (production), answers with an
+  empty response carrying X-Accel-Redirect, and nginx sends the file from
+  an `internal` location, so Python never streams image bytes;
+- otherwise (development), returns a FileResponse, which uses the
+  server's sendfile support when available, with single-range requests
+  answered with 206 Partial Content.
+
+Files are either original images (CapturedImage.image; content-addressed
+blobs may be shared by several images and owners) or resized derivatives
+(derivatives/<image short_uuid>/<size>.<ext>).
+"""
+
+import mimetypes
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date
+from captures.models import CapturedImage
+from captures.storage import is_content_addressed
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def find_owned_file(user, name):
+    """
+    Return the storage holding `name` if `user` owns an image using it,
+    otherwise None.
+    """
+    images = CapturedImage.objects.for_user(user)
+    parts = name.split('/')
+    if parts[0] == 'derivatives' and len(parts) == 3:
+        derivatives = images.filter(short_uuid=parts[1]).values_list('derivatives', flat=True).first()
+        if derivatives is not None and name in derivatives.values():
+            return default_storage
+        return None
+    if images.filter(image=name).exists():
+        return CapturedImage._meta.get_field('image').storage
+    return None
+
+
+def cache_control(name):
+    if is_content_addressed(name):
+        # The name is the content hash
+        return 'private, max-age=31536000, immutable'
+    return 'private, no-cache'
+
+
+def serve(request, storage, name):
+    """Send the file `name` from `storage` to an authorized user."""
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    accel_prefix = settings.CAPTURES_MEDIA_ACCEL_REDIRECT
+    if accel_prefix:
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_prefix + quote(name)
+    else:
+        response = file_response(request, storage, name, content_type)
+    response['Cache-Control'] = cache_control(name)
+    return response
+
+
+def file_response(request, storage, name, content_type):
+    """FileResponse for `name`, honoring a single-range Range header."""
+    size = storage.size(name)
+    byte_range = parse_range(request.headers.get('Range'), size)
+
+    if byte_range is None:
+        response = FileResponse(storage.open(name), content_type=content_type)
+    elif byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    else:
+        start, end = byte_range
+        f = storage.open(name)
+        f.seek(start)
+        response = StreamingHttpResponse(
+            read_range(f, end - start + 1), status=206, content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['Last-Modified'] = http_date(storage.get_modified_time(name).timestamp())
+    return response
+
+
+def parse_range(header, size):
+    """
+    Parse a Range header for a file of `size` bytes.
+
+    Returns (start, end) inclusive, 'unsatisfiable', or None to send the
+    whole file (no header, or one we don't support such as multiple ranges).
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if match is None or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return 'unsatisfiable'
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return 'unsatisfiable'
+    return start, end
+
+
+def read_range(f, length):
+    try:
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
@@ -0,0 +1,34 @@
+# Generated by Django 4.2 on 2026-10-18 13:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('captures', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='capturedimage',
+            name='derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.CreateModel(
+            name='DerivativeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('image', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='derivative_jobs', to='captures.capturedimage')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='derivativejob',
+            index=models.Index(fields=['status', 'id'], name='captures_de_status_d6dee5_idx'),
+        ),
+    ]
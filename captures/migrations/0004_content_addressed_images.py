@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-18 14:02
+
+import captures.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('captures', '0003_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='capturedimage',
+            name='image',
+            field=models.ImageField(db_index=True, storage=captures.storage.select_image_storage, upload_to='captures/%Y/%m/%d/'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-18 14:07
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    CapturedItem = apps.get_model('captures', 'CapturedItem')
+    CapturedImage = apps.get_model('captures', 'CapturedImage')
+
+    images = CapturedImage.objects.filter(captured_item=OuterRef('pk')).order_by().values('captured_item')
+    CapturedItem.objects.update(
+        image_count=Coalesce(
+            Subquery(images.annotate(n=Count('id')).values('n'), output_field=IntegerField()),
+            Value(0),
+        ),
+        next_order=Coalesce(
+            Subquery(images.annotate(top=Max('order') + 1).values('top'), output_field=IntegerField()),
+            Value(0),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('captures', '0004_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='captureditem',
+            name='image_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='captureditem',
+            name='next_order',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('captures', '0005_captureditem_image_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='captureditem',
+            name='transcript_revision',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2 on 2026-10-18 14:18
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+# search_vector is only maintained on PostgreSQL; other databases (SQLite in
+# development and tests) keep the column NULL and search with icontains.
+CREATE_SEARCH = """
+CREATE INDEX captures_item_search_gin ON captures_captureditem USING gin (search_vector);
+CREATE TRIGGER captures_captureditem_search_vector
+    BEFORE INSERT OR UPDATE OF voice_transcript ON captures_captureditem
+    FOR EACH ROW EXECUTE FUNCTION
+    tsvector_update_trigger(search_vector, 'pg_catalog.english', voice_transcript);
+UPDATE captures_captureditem SET search_vector = to_tsvector('pg_catalog.english', voice_transcript);
+"""
+
+DROP_SEARCH = """
+DROP TRIGGER IF EXISTS captures_captureditem_search_vector ON captures_captureditem;
+DROP INDEX IF EXISTS captures_item_search_gin;
+"""
+
+
+def create_search(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SEARCH)
+
+
+def drop_search(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SEARCH)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('captures', '0006_captureditem_transcript_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='captureditem',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='captureditem',
+                    index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='captures_item_search_gin'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search, drop_search),
+            ],
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2 on 2026-10-18 14:21
+
+import core.fields
+from django.db import migrations
+
+
+def align_uuids(apps, schema_editor):
+    """
+    Rows created before short_uuid was derived have two unrelated random
+    values. short_uuid is the public identifier (URLs, storage paths), so
+    keep it and rewrite uuid to the value it encodes.
+    """
+    for model_name in ['CapturedItem', 'CapturedImage', 'UploadSession']:
+        model = apps.get_model('captures', model_name)
+        batch = []
+        for obj in model.objects.only('id', 'uuid', 'short_uuid').iterator(chunk_size=2000):
+            try:
+                uuid = core.fields.decode(obj.short_uuid)
+            except ValueError:
+                # Not a shortuuid encoding; leave the row as it is
+                continue
+            if uuid != obj.uuid:
+                obj.uuid = uuid
+                batch.append(obj)
+            if len(batch) >= 500:
+                model.objects.bulk_update(batch, ['uuid'])
+                batch = []
+        model.objects.bulk_update(batch, ['uuid'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('captures', '0007_captureditem_search_vector'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='capturedimage',
+            name='short_uuid',
+            field=core.fields.ShortUUIDField(editable=False, max_length=22, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='captureditem',
+            name='short_uuid',
+            field=core.fields.ShortUUIDField(editable=False, max_length=22, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='uploadsession',
+            name='short_uuid',
+            field=core.fields.ShortUUIDField(editable=False, max_length=22, unique=True),
+        ),
+        migrations.RunPython(align_uuids, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('captures', '0008_short_uuid_from_uuid'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='capturedimage',
+            name='order',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
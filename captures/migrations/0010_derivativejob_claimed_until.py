@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 15:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('captures', '0009_capturedimage_order_integer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='derivativejob',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,5 +1,86 @@
-from django.db import models
-from core.models import OwnedModel
+import os
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVectorField
+from django.db import connections, models, transaction
+from django.db.models import F, FloatField, Value
+from django.utils import timezone
+from core.models import OwnedModel, OwnedModelManager
+from captures.cache import invalidate_owner
+from captures.storage import select_image_storage
+
+
+# Maximum number of images a single capture may hold
+MAX_IMAGES_PER_CAPTURE = 20
+
+# Text search configuration used by the search_vector trigger and queries
+SEARCH_CONFIG = 'english'
+# Delimiters SearchHeadline puts around matches; replaced after HTML escaping
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_STOP = '\x03'
+
+
+class ImageLimitExceeded(Exception):
+    """Raised when an upload would push a capture past MAX_IMAGES_PER_CAPTURE."""
+    def __init__(self, current_count, new_count):
+        self.current_count = current_count
+        self.new_count = new_count
+        super().__init__(
+            f'Cannot upload {new_count} images. Capture already has {current_count} images. '
+            f'Maximum is {MAX_IMAGES_PER_CAPTURE}.'
+        )
+
+
+class TranscriptConflict(Exception):
+    """Raised when a transcript delta was made against an outdated revision."""
+    def __init__(self, current_revision):
+        self.current_revision = current_revision
+        super().__init__(
+            f'Transcript has changed since this edit was made. Current revision is {current_revision}.'
+        )
+
+
+class InvalidTranscriptDelta(Exception):
+    """Raised when a transcript delta does not fit the current text."""
+
+
+class CapturedItemQuerySet(models.QuerySet):
+    """QuerySet with transcript search."""
+
+    def search(self, text):
+        """
+        Return captures matching `text`, best matches first, annotated with
+        `rank` and a `snippet` of the transcript with matches delimited by
+        HIGHLIGHT_START/HIGHLIGHT_STOP.
+
+        On PostgreSQL this uses the GIN-indexed search_vector (maintained by
+        a trigger, see migration 0007) with websearch syntax. Other databases
+        fall back to a case-insensitive substring match, newest first.
+        """
+        if connections[self.db].vendor != 'postgresql':
+            return (
+                self.filter(voice_transcript__icontains=text)
+                .annotate(rank=Value(0.0, output_field=FloatField()), snippet=F('voice_transcript'))
+                .order_by('-created_at', '-id')
+            )
+
+        query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+        return (
+            self.filter(search_vector=query)
+            .annotate(
+                rank=SearchRank(F('search_vector'), query),
+                snippet=SearchHeadline(
+                    'voice_transcript',
+                    query,
+                    config=SEARCH_CONFIG,
+                    start_sel=HIGHLIGHT_START,
+                    stop_sel=HIGHLIGHT_STOP,
+                    max_fragments=2,
+                ),
+            )
+            .order_by('-rank', '-created_at', '-id')
+        )
 
 
 class CapturedItem(OwnedModel):
@@ -11,17 +92,147 @@ class CapturedItem(OwnedModel):
     """
     voice_transcript = models.TextField(blank=True)
     is_complete = models.BooleanField(default=False)
+    # Maintained counters so hot paths avoid COUNT/MAX over images.
+    # Kept in step by CapturedImageManager.bulk_append and captures.signals
+    # with F() updates only, never by save() (see COUNTER_FIELDS);
+    # `manage.py reconcile_image_counts` repairs any drift.
+    image_count = models.PositiveSmallIntegerField(default=0, editable=False)
+    next_order = models.PositiveIntegerField(default=0, editable=False)
+    # Bumped on every transcript write so delta edits can detect stale bases
+    transcript_revision = models.PositiveIntegerField(default=0, editable=False)
+    # to_tsvector(voice_transcript), set by a database trigger on PostgreSQL
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = OwnedModelManager.from_queryset(CapturedItemQuerySet)()
 
     class Meta:
         indexes = [
             models.Index(fields=['owner', '-created_at']),
             models.Index(fields=['owner', 'is_complete']),
+            GinIndex(fields=['search_vector'], name='captures_item_search_gin'),
         ]
 
+    # Left out of full saves of existing rows: an instance loaded before a
+    # concurrent upload or delete would otherwise write back stale counts
+    COUNTER_FIELDS = ('image_count', 'next_order')
+
     def __str__(self):
         preview = (self.voice_transcript[:50] + '...') if self.voice_transcript else 'Empty'
         return f"Capture {self.short_uuid}: {preview}"
 
+    def save(self, *args, **kwargs):
+        if not (self._state.adding or args or kwargs.get('force_insert')) and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def apply_transcript_delta(self, revision, ops, save=True):
+        """
+        Apply text edits made against `revision` and save the result.
+
+        Each op is a dict with `offset`, `delete` and `insert`; offsets count
+        Unicode code points and refer to the text as left by the previous op.
+        The caller must hold a row lock (select_for_update) on this capture,
+        or stage the edit through captures.transcripts.stage_transcript.
+
+        Raises TranscriptConflict if `revision` is not the current one, and
+        InvalidTranscriptDelta if an op reaches past the end of the text.
+        With save=False only the instance is updated.
+        """
+        if revision != self.transcript_revision:
+            raise TranscriptConflict(self.transcript_revision)
+
+        text = self.voice_transcript
+        for op in ops:
+            offset, delete = op['offset'], op['delete']
+            if offset + delete > len(text):
+                raise InvalidTranscriptDelta(
+                    f'Edit at offset {offset} deleting {delete} characters is outside '
+                    f'the transcript ({len(text)} characters).'
+                )
+            text = text[:offset] + op['insert'] + text[offset + delete:]
+
+        self.voice_transcript = text
+        self.transcript_revision += 1
+        if save:
+            self.save(update_fields=['voice_transcript', 'transcript_revision', 'updated_at'])
+
+
+class CapturedImageManager(OwnedModelManager):
+    """Manager with a bulk append path for image uploads."""
+
+    def bulk_append(self, capture, files):
+        """
+        Append files to the end of a capture in a single multi-row INSERT.
+
+        Locks the capture row for the duration of the transaction so that
+        concurrent uploads to the same capture cannot reserve overlapping
+        order ranges. The limit check and order range come from the
+        capture's maintained image_count and next_order counters, which
+        are advanced in the same transaction.
+
+        Raises ImageLimitExceeded if the upload would exceed the limit.
+        """
+        with transaction.atomic():
+            # Serialize concurrent uploads on this capture
+            image_count, next_order = (
+                CapturedItem.objects.select_for_update()
+                .filter(pk=capture.pk)
+                .values_list('image_count', 'next_order')
+                .get()
+            )
+            if image_count + len(files) > MAX_IMAGES_PER_CAPTURE:
+                raise ImageLimitExceeded(image_count, len(files))
+
+            images = [
+                self.model(
+                    owner_id=capture.owner_id,
+                    captured_item=capture,
+                    image=image_file,
+                    order=next_order + i,
+                )
+                for i, image_file in enumerate(files)
+            ]
+            created = self.bulk_create(images)
+
+            # Queue derivative generation; the worker sees these once we commit
+            DerivativeJob.objects.bulk_create(
+                DerivativeJob(image=image) for image in created
+            )
+
+            # bulk_create sends no post_save signals, so advance the counters here
+            CapturedItem.objects.filter(pk=capture.pk).update(
+                image_count=F('image_count') + len(created),
+                next_order=F('next_order') + len(created),
+            )
+            capture.image_count = image_count + len(created)
+            capture.next_order = next_order + len(created)
+            invalidate_owner(capture.owner_id)
+            return created
+
+    def apply_order(self, capture, images):
+        """
+        Persist each image's list position as its order within capture.
+
+        Only rows whose order actually changes are written, and they are
+        written with a single UPDATE (CASE on id) via bulk_update.
+        Returns the list of images that moved.
+        """
+        now = timezone.now()
+        moved = []
+        for position, image in enumerate(images):
+            if image.order != position:
+                image.order = position
+                image.updated_at = now
+                moved.append(image)
+        if moved:
+            self.bulk_update(moved, ['order', 'updated_at'])
+            # bulk_update sends no post_save signals
+            invalidate_owner(capture.owner_id)
+        return moved
+
 
 class CapturedImage(OwnedModel):
     """
@@ -33,11 +244,107 @@ class CapturedImage(OwnedModel):
         on_delete=models.CASCADE,
         related_name='images'
     )
-    image = models.ImageField(upload_to='captures/%Y/%m/%d/')
-    order = models.PositiveSmallIntegerField(default=0)
+    # Indexed so deletes can cheaply check whether a shared blob is still referenced
+    image = models.ImageField(
+        upload_to='captures/%Y/%m/%d/',
+        storage=select_image_storage,
+        db_index=True
+    )
+    # Assigned from next_order, which never goes back down
+    order = models.PositiveIntegerField(default=0)
+    # Resized variants keyed by size name, e.g. {"thumb": "derivatives/<short_uuid>/thumb.webp"}
+    derivatives = models.JSONField(default=dict, blank=True, editable=False)
+
+    objects = CapturedImageManager()
 
     class Meta:
         ordering = ['order', 'created_at']
         indexes = [
             models.Index(fields=['captured_item', 'order']),
         ]
+
+    def save(self, *args, **kwargs):
+        # A content-addressed file is locked when it is stored, and the lock
+        # must be held until this row commits (see captures.storage)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    @property
+    def thumb_url(self):
+        """URL to show this image as a tile: the thumb derivative, or the original until it exists."""
+        name = self.derivatives.get('thumb')
+        return default_storage.url(name) if name else self.image.url
+
+
+class DerivativeJob(models.Model):
+    """
+    Queue entry for generating resized variants of a CapturedImage.
+
+    The table is the queue: workers claim pending rows with
+    SELECT ... FOR UPDATE SKIP LOCKED, lease them by setting claimed_until,
+    and delete them on success.
+    Queue rows are internal bookkeeping, so they skip BaseModel's
+    public identifiers.
+    """
+    PENDING = 'pending'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (FAILED, 'Failed'),
+    ]
+
+    image = models.ForeignKey(
+        CapturedImage,
+        on_delete=models.CASCADE,
+        related_name='derivative_jobs'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Set while a worker generates the variants; once it passes (the worker
+    # died) another worker may take the job
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"DerivativeJob {self.pk} ({self.status}) for image {self.image_id}"
+
+
+class UploadSession(OwnedModel):
+    """
+    A resumable, chunked upload of a single image into a capture.
+
+    Chunks are appended to a temp file under CAPTURES_UPLOAD_TEMP_DIR;
+    `offset` records how many bytes have been durably written. Once the
+    whole file has arrived it is validated and turned into a CapturedImage.
+    """
+    captured_item = models.ForeignKey(
+        CapturedItem,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+    filename = models.CharField(max_length=255)
+    size = models.PositiveIntegerField()
+    offset = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"UploadSession {self.short_uuid}: {self.offset}/{self.size} bytes"
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.CAPTURES_UPLOAD_TEMP_DIR, f'{self.short_uuid}.part')
+
+    @property
+    def is_complete(self):
+        return self.offset == self.size
+
+    def discard_temp_file(self):
+        try:
+            os.remove(self.temp_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,80 @@
+"""
+Signal handlers for the captures app.
+"""
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, QuerySet, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from captures.cache import invalidate_owner
+from captures.derivatives import derivative_files
+from captures.models import CapturedImage, CapturedItem
+from captures.storage import is_content_addressed, lock_blob
+
+
+@receiver(post_save, sender=CapturedItem)
+@receiver(post_delete, sender=CapturedItem)
+@receiver(post_save, sender=CapturedImage)
+@receiver(post_delete, sender=CapturedImage)
+def invalidate_owner_responses(sender, instance, **kwargs):
+    """Drop the owner's cached API responses when a capture or image changes."""
+    invalidate_owner(instance.owner_id)
+
+
+@receiver(post_save, sender=CapturedImage)
+def count_added_image(sender, instance, created, raw=False, **kwargs):
+    """
+    Advance the parent capture's image counters for a singly created image.
+
+    bulk_append sends no post_save and updates the counters itself.
+    """
+    if not created or raw:
+        return
+    CapturedItem.objects.filter(pk=instance.captured_item_id).update(
+        image_count=F('image_count') + 1,
+        next_order=Greatest(F('next_order'), Value(instance.order + 1)),
+    )
+
+
+@receiver(post_delete, sender=CapturedImage)
+def count_removed_image(sender, instance, origin=None, **kwargs):
+    """
+    Decrement the parent capture's image count.
+
+    Skipped when the capture itself is being deleted, since the row is
+    about to go away with its images.
+    """
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model is CapturedItem:
+        return
+    # Never below zero, even if the counter had drifted
+    CapturedItem.objects.filter(pk=instance.captured_item_id).update(
+        image_count=Greatest(F('image_count') - 1, Value(0)),
+    )
+
+
+@receiver(post_delete, sender=CapturedImage)
+def release_image_files(sender, instance, **kwargs):
+    """
+    Delete files that belonged only to the deleted image.
+
+    Derivatives are per-image and always removed. A content-addressed
+    original is shared by every image with the same content, so it is
+    only removed once no CapturedImage references it any more; that is
+    checked under the blob's lock, which an upload reusing the blob holds
+    until its row commits. Runs after commit so a rolled-back delete
+    never loses files.
+    """
+    def delete_files():
+        # instance.derivatives may predate a save by the derivative worker
+        for name in derivative_files(instance):
+            default_storage.delete(name)
+        name = instance.image.name
+        if is_content_addressed(name):
+            with transaction.atomic():
+                lock_blob(name)
+                if not CapturedImage.objects.filter(image=name).exists():
+                    instance.image.storage.delete(name)
+
+    transaction.on_commit(delete_files)
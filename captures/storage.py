@@ -0,0 +1,108 @@
+"""
+Storage backends for captured images.
+
+With CAPTURES_CONTENT_ADDRESSED_STORAGE enabled, image files are named by
+the SHA-256 of their content (cas/ab/cd/<digest>.<ext>). Uploading the same
+photo twice, which is common when clients retry, stores one file that both
+CapturedImage rows point at. Because a name can never refer to different
+content, the files can be cached by browsers and nginx indefinitely.
+
+A blob is deleted once the last CapturedImage referencing it is deleted
+(see captures.signals). Writing or reusing a blob and deleting it both
+happen under lock_blob, held until the surrounding transaction ends, so a
+blob can't be deleted between an upload finding it and the upload's row
+committing.
+"""
+
+import hashlib
+import os
+import tempfile
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import connection
+
+CAS_PREFIX = 'cas/'
+
+
+def file_sha256(file):
+    """
+    Return the hex SHA-256 of a file's content, caching it as file.sha256.
+
+    Uploads that went through the streaming handlers already carry the
+    digest, so they are not read a second time.
+    """
+    digest = getattr(file, 'sha256', None)
+    if digest is None:
+        hasher = hashlib.sha256()
+        file.seek(0)
+        for chunk in file.chunks():
+            hasher.update(chunk)
+        file.seek(0)
+        digest = hasher.hexdigest()
+        file.sha256 = digest
+    return digest
+
+
+def is_content_addressed(name):
+    return name.startswith(CAS_PREFIX)
+
+
+def lock_blob(name):
+    """
+    Lock the blob `name` until the current transaction ends.
+
+    Uses a PostgreSQL transaction-level advisory lock; a no-op on other
+    databases (development). Outside a transaction the lock is released
+    immediately, so callers must be inside transaction.atomic().
+    """
+    if connection.vendor != 'postgresql':
+        return
+    key = int(hashlib.sha256(name.encode()).hexdigest()[:15], 16)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage that names files by content hash and stores each once.
+
+    The name chosen by upload_to only contributes its extension.
+    """
+
+    def save(self, name, content, max_length=None):
+        digest = file_sha256(content)
+        ext = os.path.splitext(name)[1].lower()
+        name = f'{CAS_PREFIX}{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+        lock_blob(name)
+        if not self.exists(name):
+            self._save_blob(name, content)
+        return name
+
+    def _save_blob(self, name, content):
+        """
+        Write content to `name` through a temp file and an atomic rename.
+
+        Never picks an alternative name: a concurrent writer of the same
+        name is writing the same bytes, so whichever rename lands last wins.
+        """
+        path = self.path(name)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in content.chunks():
+                    f.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+def select_image_storage():
+    """Storage for CapturedImage.image, chosen by CAPTURES_CONTENT_ADDRESSED_STORAGE."""
+    if settings.CAPTURES_CONTENT_ADDRESSED_STORAGE:
+        return ContentAddressedStorage()
+    return default_storage
@@ -1,14 +1,49 @@
 """
 Tests for the captures app.
 """
-from io import BytesIO
-from PIL import Image
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from PIL import Image, ImageOps
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.urls import resolve
+from django.utils import timezone
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework import status
-from captures.models import CapturedItem, CapturedImage
+from accounts.api.tokens import issue_token
+from captures import derivatives, events, transcripts
+from captures.api.serializers import CaptureSearchResultSerializer, ImageUploadSerializer
+from captures.api.views import CapturedItemViewSet
+from captures.asgi import EventStreamDisconnectMiddleware, UploadLimitMiddleware
+from captures.cache import bump_owner_version, get_owner_version, get_response_cache
+from captures.derivatives import process_next_job, process_pending_jobs
+from captures.models import (
+    CapturedItem,
+    CapturedImage,
+    DerivativeJob,
+    ImageLimitExceeded,
+    UploadSession,
+)
+from captures.uploadhandlers import get_upload_rejection, image_upload_handlers
+from captures.validators import inspect_image_file, validate_image_file
 
 User = get_user_model()
 
@@ -24,11 +59,25 @@ def create_test_image(name='test.jpg', size=(100, 100), color='red'):
     return SimpleUploadedFile(name, file.read(), content_type='image/jpeg')
 
 
+def use_temp_file_dirs(test):
+    """Point MEDIA_ROOT and the upload temp dir at a directory removed after the test."""
+    temp_dir = tempfile.TemporaryDirectory()
+    test.addCleanup(temp_dir.cleanup)
+    file_settings = test.settings(
+        CAPTURES_UPLOAD_TEMP_DIR=os.path.join(temp_dir.name, 'uploads'),
+        MEDIA_ROOT=os.path.join(temp_dir.name, 'media'),
+    )
+    file_settings.enable()
+    test.addCleanup(file_settings.disable)
+
+
 class CaptureBaseTestCase(TestCase):
     """
     Base test case with common setup for capture tests.
     """
     def setUp(self):
+        # Keep uploaded images, derivatives and temp chunks out of the source tree
+        use_temp_file_dirs(self)
         self.client = APIClient()
         self.user = User.objects.create_user(
             username='testuser',
@@ -39,6 +88,8 @@ class CaptureBaseTestCase(TestCase):
             password='otherpass123'
         )
         self.client.force_authenticate(user=self.user)
+        # User ids repeat across tests, so cached responses must not carry over
+        cache.clear()
 
 
 class CapturedItemTests(CaptureBaseTestCase):
@@ -94,6 +145,687 @@ class CapturedItemTests(CaptureBaseTestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+class ImageValidationTests(TestCase):
+    """
+    Tests for the single-pass image validation engine.
+    """
+    def test_inspect_returns_image_info(self):
+        """Test that format, dimensions, size and MIME type are reported."""
+        file = create_test_image('photo.jpg', size=(120, 80))
+
+        info = inspect_image_file(file)
+
+        self.assertEqual(info.format, 'JPEG')
+        self.assertEqual((info.width, info.height), (120, 80))
+        self.assertEqual(info.size, file.size)
+        self.assertEqual(info.mime_type, 'image/jpeg')
+        self.assertEqual(file.tell(), 0)
+
+    def test_validator_attaches_image_info(self):
+        """Test that validate_image_file exposes the result on the file."""
+        file = create_test_image('photo.jpg')
+        validate_image_file(file)
+        self.assertEqual(file.image_info.format, 'JPEG')
+
+    def test_rejects_non_image_content(self):
+        """Test that a file with an image extension but text content fails."""
+        file = SimpleUploadedFile('fake.jpg', b'not an image at all' * 10)
+        with self.assertRaises(DjangoValidationError):
+            inspect_image_file(file)
+
+    def test_rejects_mismatched_extension_and_format(self):
+        """Test that disallowed extensions are rejected."""
+        file = create_test_image('photo.gif')
+        with self.assertRaises(DjangoValidationError):
+            inspect_image_file(file)
+
+    def test_rejects_oversized_dimensions_before_verify(self):
+        """Test that the pixel limit is enforced from the header alone."""
+        file = create_test_image('photo.jpg', size=(20, 20))
+        with mock.patch('captures.validators.MAX_PIXELS', 100), \
+                mock.patch.object(Image.Image, 'verify') as verify:
+            with self.assertRaises(DjangoValidationError) as ctx:
+                inspect_image_file(file)
+        verify.assert_not_called()
+        self.assertIn('too large', str(ctx.exception))
+
+    def test_upload_rejects_invalid_image(self):
+        """Test that the upload endpoint reports validation errors per file."""
+        user = User.objects.create_user(username='validator', password='pass12345')
+        client = APIClient()
+        client.force_authenticate(user=user)
+        capture = CapturedItem.objects.create(owner=user)
+
+        response = client.post(
+            f'/api/captures/items/{capture.short_uuid}/upload_images/',
+            {'images': [SimpleUploadedFile('fake.png', b'\x89PNG\r\n\x1a\n' + b'garbage' * 20)]},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('images', response.data)
+        self.assertEqual(capture.images.count(), 0)
+
+
+class ParallelValidationTests(TestCase):
+    """
+    Tests for concurrent validation of multi-file uploads.
+    """
+    def test_valid_files_keep_input_order(self):
+        """Test that validated files come back in upload order."""
+        files = [create_test_image(f'photo{i}.jpg') for i in range(6)]
+        serializer = ImageUploadSerializer(data={'images': files})
+
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(
+            [f.name for f in serializer.validated_data['images']],
+            [f'photo{i}.jpg' for i in range(6)]
+        )
+
+    def test_errors_are_keyed_by_file_index(self):
+        """Test that each invalid file is reported under its own index."""
+        files = [
+            create_test_image('good.jpg'),
+            SimpleUploadedFile('bad.jpg', b'not an image' * 10),
+            create_test_image('good2.jpg'),
+            SimpleUploadedFile('bad.txt', b'plain text'),
+        ]
+        serializer = ImageUploadSerializer(data={'images': files})
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(sorted(serializer.errors['images'].keys()), [1, 3])
+
+    def test_validation_runs_on_pool_threads(self):
+        """Test that per-file validation is fanned out to the pool."""
+        threads = set()
+
+        def record_thread(file):
+            threads.add(threading.current_thread().name)
+
+        files = [create_test_image(f'photo{i}.jpg') for i in range(4)]
+        serializer = ImageUploadSerializer(data={'images': files})
+        serializer.fields['images'].child.validators = [record_thread]
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        self.assertTrue(all(name.startswith('capture-validation') for name in threads))
+
+    @override_settings(CAPTURES_VALIDATION_WORKERS=1)
+    def test_single_worker_validates_sequentially(self):
+        """Test that one worker falls back to in-thread validation."""
+        files = [create_test_image('good.jpg'), SimpleUploadedFile('bad.jpg', b'nope' * 10)]
+        serializer = ImageUploadSerializer(data={'images': files})
+
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(list(serializer.errors['images'].keys()), [1])
+
+
+class StreamingUploadHandlerTests(CaptureBaseTestCase):
+    """
+    Tests for early rejection in the streaming upload handlers.
+    """
+    def parse_files(self, *files):
+        request = RequestFactory().post('/upload/', {'images': list(files)})
+        request.upload_handlers = image_upload_handlers(request)
+        return request.FILES.getlist('images'), get_upload_rejection(request)
+
+    def upload(self, *files):
+        capture = CapturedItem.objects.create(owner=self.user)
+        response = self.client.post(
+            f'/api/captures/items/{capture.short_uuid}/upload_images/',
+            {'images': list(files)},
+            format='multipart'
+        )
+        return capture, response
+
+    def test_accepted_files_carry_sha256(self):
+        """Test that content is hashed while streaming."""
+        image = create_test_image('photo.jpg')
+        content = image.read()
+        image.seek(0)
+
+        files, rejection = self.parse_files(image)
+
+        self.assertIsNone(rejection)
+        self.assertEqual(files[0].sha256, hashlib.sha256(content).hexdigest())
+
+    def test_bad_signature_rejected(self):
+        """Test that a non-image body is rejected from its first bytes."""
+        capture, response = self.upload(SimpleUploadedFile('photo.jpg', b'MZ\x90\x00' + b'x' * 5000))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Invalid file type', response.data['error'])
+        self.assertEqual(capture.images.count(), 0)
+
+    def test_disallowed_extension_rejected(self):
+        """Test that the extension is checked before any data is stored."""
+        files, rejection = self.parse_files(SimpleUploadedFile('script.svg', b'<svg></svg>'))
+
+        self.assertEqual(files, [])
+        self.assertIn('Unsupported file extension', str(rejection))
+
+    def test_oversized_file_rejected_while_streaming(self):
+        """Test that a file is aborted once it passes the size limit."""
+        with mock.patch('captures.uploadhandlers.MAX_FILE_SIZE', 1024):
+            capture, response = self.upload(create_test_image('big.jpg', size=(400, 400)))
+
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertEqual(capture.images.count(), 0)
+
+    def test_oversized_request_rejected_before_first_file(self):
+        """Test that an over-limit Content-Length is rejected up front."""
+        with mock.patch('captures.uploadhandlers.MAX_REQUEST_SIZE', 100):
+            files, rejection = self.parse_files(create_test_image('photo.jpg'))
+
+        self.assertEqual(files, [])
+        self.assertEqual(rejection.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+
+@override_settings(CAPTURES_UPLOAD_MAX_CHUNK_SIZE=10)
+class UploadLimitMiddlewareTests(TestCase):
+    """
+    Tests for upload size limits enforced before ASGI bodies are read.
+    """
+    chunk_path = '/api/captures/items/abc/uploads/def/'
+
+    async def call(self, path, chunks, content_length=None):
+        """Run a request through the middleware; return (sent messages, received messages)."""
+        received, sent = [], []
+        messages = [{'type': 'http.request', 'body': chunk, 'more_body': True} for chunk in chunks]
+        messages[-1]['more_body'] = False
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        async def app(scope, receive, send):
+            while True:
+                message = await receive()
+                received.append(message)
+                if message['type'] == 'http.disconnect' or not message.get('more_body'):
+                    return
+
+        headers = [] if content_length is None else [(b'content-length', str(content_length).encode())]
+        scope = {'type': 'http', 'path': path, 'method': 'PATCH', 'headers': headers}
+        await UploadLimitMiddleware(app)(scope, receive, send)
+        return sent, received
+
+    async def test_declared_oversized_body_is_never_read(self):
+        """Test that an over-limit Content-Length is refused before the app runs."""
+        sent, received = await self.call(self.chunk_path, [b'x' * 20], content_length=20)
+
+        self.assertEqual(received, [])
+        self.assertEqual(sent[0]['status'], 413)
+        self.assertEqual(json.loads(sent[1]['body'])['max_chunk_size'], 10)
+
+    async def test_undeclared_body_is_cut_off_at_the_limit(self):
+        """Test that a body without Content-Length stops being read once over the limit."""
+        sent, received = await self.call(self.chunk_path, [b'x' * 6, b'x' * 6, b'x' * 6])
+
+        self.assertEqual([m['type'] for m in received], ['http.request', 'http.disconnect'])
+        self.assertEqual(sent[0]['status'], 413)
+
+    async def test_other_routes_and_small_bodies_pass_through(self):
+        """Test that bodies within the limit, and other routes, reach the app."""
+        sent, received = await self.call(self.chunk_path, [b'x' * 10], content_length=10)
+        self.assertEqual((sent, len(received)), ([], 1))
+
+        sent, received = await self.call('/api/captures/items/abc/', [b'x' * 20], content_length=20)
+        self.assertEqual((sent, len(received)), ([], 1))
+
+    def test_asgi_application_enforces_limits(self):
+        """Test that the project's ASGI application is wrapped."""
+        from schmango.asgi import application
+
+        self.assertIsInstance(application, EventStreamDisconnectMiddleware)
+        self.assertIsInstance(application.app, UploadLimitMiddleware)
+
+
+@override_settings(CAPTURES_RESPONSE_CACHE=None)
+class ConditionalGetTests(CaptureBaseTestCase):
+    """
+    Tests for ETag / Last-Modified support on capture detail.
+
+    The response cache is disabled so validators are computed on every request.
+    """
+    def setUp(self):
+        super().setUp()
+        self.capture = CapturedItem.objects.create(owner=self.user)
+        self.url = f'/api/captures/items/{self.capture.short_uuid}/'
+
+    def etag(self):
+        return self.client.get(self.url)['ETag']
+
+    def test_detail_includes_validators(self):
+        """Test that the detail response carries ETag and Last-Modified."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+
+    def test_matching_etag_returns_304_with_one_query(self):
+        """Test that an unchanged capture is answered from metadata alone."""
+        etag = self.etag()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_changes_when_capture_changes(self):
+        """Test that edits, image uploads, reorders and deletes change the ETag."""
+        etags = [self.etag()]
+
+        self.client.patch(self.url, {'voice_transcript': 'Buy milk'})
+        etags.append(self.etag())
+
+        self.client.post(
+            f'{self.url}upload_images/',
+            {'images': [create_test_image('a.jpg'), create_test_image('b.jpg', color='blue')]},
+            format='multipart'
+        )
+        etags.append(self.etag())
+
+        first, second = self.capture.images.all()
+        self.client.patch(f'{self.url}reorder/', {'order': [str(second.uuid), str(first.uuid)]}, format='json')
+        etags.append(self.etag())
+
+        self.client.delete(f'{self.url}images/{first.short_uuid}/')
+        etags.append(self.etag())
+
+        self.client.post(f'{self.url}complete/')
+        etags.append(self.etag())
+
+        self.assertEqual(len(set(etags)), len(etags))
+
+    def test_stale_etag_returns_full_response(self):
+        """Test that an outdated ETag gets a normal 200 response."""
+        etag = self.etag()
+        self.client.patch(self.url, {'voice_transcript': 'Changed'})
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['voice_transcript'], 'Changed')
+
+    def test_other_users_capture_still_404(self):
+        """Test that conditional handling doesn't leak other users' captures."""
+        other = CapturedItem.objects.create(owner=self.other_user)
+        response = self.client.get(f'/api/captures/items/{other.short_uuid}/', HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ResponseCacheTests(CaptureBaseTestCase):
+    """
+    Tests for the per-user response cache and its invalidation.
+    """
+    def setUp(self):
+        super().setUp()
+        self.capture = CapturedItem.objects.create(owner=self.user, voice_transcript='Original')
+        self.url = f'/api/captures/items/{self.capture.short_uuid}/'
+
+    def test_repeat_reads_skip_the_database(self):
+        """Test that cached list and detail responses need no queries."""
+        self.client.get('/api/captures/items/')
+        self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            list_response = self.client.get('/api/captures/items/')
+            detail_response = self.client.get(self.url)
+
+        self.assertEqual(list_response.data['count'], 1)
+        self.assertEqual(detail_response.data['voice_transcript'], 'Original')
+        self.assertIn('ETag', detail_response)
+
+    def test_cached_detail_answers_conditional_get(self):
+        """Test that a cache hit still honors If-None-Match."""
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_update_invalidates_cached_responses(self):
+        """Test that saving a capture drops the owner's cached responses."""
+        self.client.get(self.url)
+        self.client.get('/api/captures/items/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.url, {'voice_transcript': 'Edited'})
+
+        self.assertEqual(self.client.get(self.url).data['voice_transcript'], 'Edited')
+        self.assertEqual(
+            self.client.get('/api/captures/items/').data['results'][0]['voice_transcript'],
+            'Edited'
+        )
+
+    def test_bulk_image_paths_invalidate(self):
+        """Test that bulk inserts and reorders, which send no signals, invalidate."""
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f'{self.url}upload_images/',
+                {'images': [create_test_image('a.jpg'), create_test_image('b.jpg', color='blue')]},
+                format='multipart'
+            )
+        images = self.client.get(self.url).data['images']
+        self.assertEqual(len(images), 2)
+
+        first, second = self.capture.images.all()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'{self.url}reorder/', {'order': [str(second.uuid), str(first.uuid)]}, format='json')
+
+        images = self.client.get(self.url).data['images']
+        self.assertEqual(images[0]['short_uuid'], second.short_uuid)
+
+    def test_background_changes_invalidate(self):
+        """Test that derivative generation outside a request invalidates."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f'{self.url}upload_images/', {'images': [create_test_image()]}, format='multipart')
+        self.assertEqual(self.client.get(self.url).data['images'][0]['derivatives'], {})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            process_pending_jobs()
+
+        self.assertIn('thumb', self.client.get(self.url).data['images'][0]['derivatives'])
+
+    def test_bump_replaces_version_without_incr(self):
+        """Test that invalidation sets a new version instead of a racy get + set incr."""
+        response_cache = get_response_cache()
+        version = get_owner_version(response_cache, self.user.pk)
+
+        with mock.patch.object(response_cache, 'incr', side_effect=AssertionError('incr called')):
+            bump_owner_version(self.user.pk)
+            bumped = get_owner_version(response_cache, self.user.pk)
+            bump_owner_version(self.user.pk)
+
+        self.assertNotEqual(bumped, version)
+        self.assertNotIn(get_owner_version(response_cache, self.user.pk), {version, bumped})
+
+    def test_cache_is_per_owner(self):
+        """Test that one user's cached list is never served to another."""
+        self.client.get('/api/captures/items/')
+
+        self.client.force_authenticate(user=self.other_user)
+        response = self.client.get('/api/captures/items/')
+
+        self.assertEqual(response.data['count'], 0)
+
+    @override_settings(CAPTURES_RESPONSE_CACHE=None)
+    def test_cache_can_be_disabled(self):
+        """Test that a None alias turns caching off."""
+        self.client.get(self.url)
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'captures-response-cache-tests'),
+    },
+})
+class FileResponseCacheTests(ResponseCacheTests):
+    """
+    Run the response cache tests against the file-based backend used in production.
+    """
+
+
+class AsyncApiTests(CaptureBaseTestCase):
+    """
+    Tests for the captures API served through Django's ASGI handler.
+    """
+    def setUp(self):
+        super().setUp()
+        self.async_client = AsyncClient()
+        self.async_client.force_login(self.user)
+        self.capture = CapturedItem.objects.create(owner=self.user, voice_transcript='Async')
+        self.image = CapturedImage.objects.create(
+            owner=self.user, captured_item=self.capture,
+            image=create_test_image('photo.jpg'), order=0
+        )
+        self.url = f'/api/captures/items/{self.capture.short_uuid}/'
+
+    def test_viewsets_dispatch_asynchronously(self):
+        """Test that the routed capture and image views are coroutine functions."""
+        self.assertTrue(iscoroutinefunction(resolve(self.url).func))
+        self.assertTrue(iscoroutinefunction(resolve(f'{self.url}images/{self.image.short_uuid}/').func))
+
+    async def test_async_reads(self):
+        """Test that list and detail work under ASGI, including conditional GET."""
+        listing = await self.async_client.get('/api/captures/items/')
+        detail = await self.async_client.get(self.url)
+        not_modified = await self.async_client.get(self.url, headers={'If-None-Match': detail['ETag']})
+        missing = await self.async_client.get('/api/captures/items/nonexistent/')
+
+        self.assertEqual(listing.json()['count'], 1)
+        self.assertEqual(detail.json()['voice_transcript'], 'Async')
+        self.assertEqual(len(detail.json()['images']), 1)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(missing.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_async_image_delete(self):
+        """Test that image deletion runs its signal receivers under ASGI."""
+        response = await self.async_client.delete(f'{self.url}images/{self.image.short_uuid}/')
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        capture = await CapturedItem.objects.aget(pk=self.capture.pk)
+        self.assertEqual(capture.image_count, 0)
+
+    async def test_sync_actions_still_work(self):
+        """Test that threaded handlers (uploads, CSRF-checked writes) work under ASGI."""
+        response = await self.async_client.post(
+            f'{self.url}upload_images/',
+            {'images': [create_test_image('new.jpg', color='blue')]}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(await CapturedImage.objects.filter(captured_item=self.capture).acount(), 2)
+
+
+class LiveEventTests(CaptureBaseTestCase):
+    """
+    Tests for live capture events and the SSE streams.
+    """
+    def setUp(self):
+        super().setUp()
+        self.async_client = AsyncClient()
+        self.async_client.force_login(self.user)
+        self.capture = CapturedItem.objects.create(owner=self.user, voice_transcript='Buy milk')
+        self.url = f'/api/captures/items/{self.capture.short_uuid}/'
+
+    async def open_stream(self, url):
+        response = await self.async_client.get(url, headers={'Accept': 'text/event-stream'})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        # The first message arrives once the stream is subscribed
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        return stream
+
+    def committed(self, *calls):
+        """Run calls (sync) and fire their on_commit callbacks."""
+        with self.captureOnCommitCallbacks(execute=True):
+            for call in calls:
+                call()
+
+    async def next_event(self, stream):
+        message = (await asyncio.wait_for(anext(stream), timeout=2)).decode()
+        event_line, data_line = message.strip().split('\n')
+        return event_line.removeprefix('event: '), json.loads(data_line.removeprefix('data: '))
+
+    async def test_capture_stream_receives_transcript_edits(self):
+        """Test that a capture's stream carries edits to it and nothing else."""
+        stream = await self.open_stream(f'{self.url}events/')
+        other = await CapturedItem.objects.acreate(owner=self.user)
+
+        await sync_to_async(self.committed)(
+            lambda: events.publish(self.user.pk, other.short_uuid, 'completed'),
+            lambda: self.client.patch(
+                f'{self.url}transcript/',
+                {'revision': 0, 'ops': [{'offset': 8, 'insert': '!'}]},
+                format='json'
+            ),
+        )
+
+        event_type, data = await self.next_event(stream)
+        self.assertEqual(event_type, 'transcript')
+        self.assertEqual(data, {'capture': self.capture.short_uuid, 'revision': 1, 'voice_transcript': 'Buy milk!'})
+        await stream.aclose()
+
+    async def test_inbox_stream_is_per_user(self):
+        """Test that the inbox carries all of the user's captures but no one else's."""
+        stream = await self.open_stream('/api/captures/items/events/')
+
+        await sync_to_async(self.committed)(
+            lambda: events.publish(self.other_user.pk, 'theirs', 'completed'),
+            lambda: events.publish(self.user.pk, 'mine', 'completed'),
+        )
+
+        self.assertEqual(await self.next_event(stream), ('completed', {'capture': 'mine'}))
+        await stream.aclose()
+
+    @override_settings(CAPTURES_EVENT_KEEPALIVE=0.01)
+    async def test_idle_stream_sends_keepalives(self):
+        """Test that idle streams send comment lines so disconnects are noticed."""
+        stream = await self.open_stream('/api/captures/items/events/')
+
+        self.assertEqual(await anext(stream), b': keepalive\n\n')
+        await stream.aclose()
+
+    async def test_stream_ends_when_client_disconnects(self):
+        """Test that a client disconnect ends the stream and releases its subscription."""
+        await sync_to_async(self.client.force_login)(self.user)
+        session_cookie = self.client.cookies[settings.SESSION_COOKIE_NAME]
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'root_path': '', 'query_string': b'',
+            'path': '/api/captures/items/events/', 'raw_path': b'/api/captures/items/events/',
+            'headers': [
+                (b'host', b'testserver'),
+                (b'accept', b'text/event-stream'),
+                (b'cookie', f'{session_cookie.key}={session_cookie.value}'.encode()),
+            ],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+        request_messages = [{'type': 'http.request', 'body': b''}]
+        disconnected = asyncio.Event()
+        streaming = asyncio.Event()
+
+        async def receive():
+            if request_messages:
+                return request_messages.pop(0)
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message.get('body'):
+                streaming.set()
+
+        subscriptions = events.get_broker()._subscriptions
+        app = EventStreamDisconnectMiddleware(ASGIHandler())
+        request = asyncio.ensure_future(app(scope, receive, send))
+        await asyncio.wait_for(streaming.wait(), timeout=2)
+        self.assertIn(self.user.pk, subscriptions)
+
+        disconnected.set()
+        await asyncio.wait_for(request, timeout=2)
+        self.assertNotIn(self.user.pk, subscriptions)
+
+    def test_other_users_capture_stream_not_found(self):
+        """Test that users cannot subscribe to other users' captures."""
+        other = CapturedItem.objects.create(owner=self.other_user)
+
+        response = self.client.get(
+            f'/api/captures/items/{other.short_uuid}/events/', HTTP_ACCEPT='text/event-stream'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_wsgi_stream_is_not_opened(self):
+        """Test that streams answer 204 under WSGI, which would buffer them forever."""
+        response = self.client.get(f'{self.url}events/', HTTP_ACCEPT='text/event-stream')
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    async def test_capture_page_opens_stream_only_under_asgi(self):
+        """Test that the capture page only opens an EventSource when streams are served."""
+        page = f'/capture/?id={self.capture.short_uuid}'
+        await sync_to_async(self.client.force_login)(self.user)
+
+        response = await sync_to_async(self.client.get)(page)
+        self.assertFalse(response.context['live_events'])
+
+        response = await self.async_client.get(page)
+        self.assertTrue(response.context['live_events'])
+
+    def test_api_writes_publish_events(self):
+        """Test that image and completion changes publish events after commit."""
+        with mock.patch.object(events.get_broker(), 'publish') as broker_publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    f'{self.url}upload_images/',
+                    {'images': [create_test_image('a.jpg'), create_test_image('b.jpg', color='blue')]},
+                    format='multipart'
+                )
+            first, second = self.capture.images.all()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(f'{self.url}reorder/', {'order': [str(second.uuid), str(first.uuid)]}, format='json')
+                self.client.delete(f'{self.url}images/{first.short_uuid}/')
+                self.client.post(f'{self.url}complete/')
+
+        published = [(c.args[0]['type'], c.args[0]['data']) for c in broker_publish.call_args_list]
+        self.assertEqual(published, [
+            ('images_added', {'images': [first.short_uuid, second.short_uuid]}),
+            ('images_reordered', {'order': [second.short_uuid, first.short_uuid]}),
+            ('image_deleted', {'image': first.short_uuid}),
+            ('completed', {}),
+        ])
+
+    def test_postgres_broker_notifies_and_truncates_large_payloads(self):
+        """Test that NOTIFY payloads stay under the Postgres size limit."""
+        broker = events.PostgresBroker()
+        event = {'type': 'transcript', 'capture': 'abc', 'owner': 1, 'data': {'voice_transcript': 'x' * 10000}}
+
+        with mock.patch('captures.events.connection') as conn:
+            broker.publish(event)
+
+        cursor = conn.cursor.return_value.__enter__.return_value
+        channel, payload = cursor.execute.call_args.args[1]
+        self.assertEqual(channel, 'captures_events')
+        self.assertEqual(json.loads(payload)['data'], {'truncated': True})
+
+
+class CursorPaginationTests(CaptureBaseTestCase):
+    """
+    Tests for keyset pagination of the capture list.
+    """
+    def test_cursor_pages_cover_all_captures(self):
+        """Test that following next links returns every capture once, newest first."""
+        created = [CapturedItem.objects.create(owner=self.user) for _ in range(25)]
+        CapturedItem.objects.create(owner=self.other_user)
+
+        seen = []
+        url = '/api/captures/items/?pagination=cursor'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen.extend(item['short_uuid'] for item in response.data['results'])
+            url = response.data['next']
+
+        expected = sorted(created, key=lambda c: (c.created_at, c.id), reverse=True)
+        self.assertEqual(seen, [c.short_uuid for c in expected])
+
+    def test_page_number_pagination_remains_default(self):
+        """Test that the list keeps page-number pagination without the opt-in."""
+        CapturedItem.objects.create(owner=self.user)
+        response = self.client.get('/api/captures/items/')
+        self.assertEqual(response.data['count'], 1)
+
+
 class ImageUploadTests(CaptureBaseTestCase):
     """
     Tests for image upload functionality.
@@ -238,6 +970,653 @@ class ImageUploadTests(CaptureBaseTestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+class BulkAppendTests(CaptureBaseTestCase):
+    """
+    Tests for the bulk image insert path.
+    """
+    def test_bulk_append_uses_single_insert(self):
+        """Test that all images are written with one INSERT statement."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        files = [create_test_image(f'photo{i}.jpg') for i in range(5)]
+
+        with CaptureQueriesContext(connection) as ctx:
+            images = CapturedImage.objects.bulk_append(capture, files)
+
+        inserts = [
+            q for q in ctx.captured_queries
+            if q['sql'].startswith('INSERT INTO "captures_capturedimage"')
+        ]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual([img.order for img in images], [0, 1, 2, 3, 4])
+        self.assertTrue(all(img.pk for img in images))
+
+    def test_bulk_append_assigns_unique_short_uuids(self):
+        """Test that bulk-created images get distinct short_uuids."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        files = [create_test_image(f'photo{i}.jpg') for i in range(3)]
+
+        images = CapturedImage.objects.bulk_append(capture, files)
+
+        short_uuids = {img.short_uuid for img in images}
+        self.assertEqual(len(short_uuids), 3)
+        self.assertTrue(all(short_uuids))
+        stored = dict(capture.images.values_list('uuid', 'short_uuid'))
+        self.assertEqual(stored, {img.uuid: img.short_uuid for img in images})
+
+    def test_bulk_append_continues_after_gap(self):
+        """Test that the reserved range starts after the current max order."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        CapturedImage.objects.create(
+            owner=self.user, captured_item=capture,
+            image=create_test_image('img.jpg'), order=7
+        )
+
+        images = CapturedImage.objects.bulk_append(capture, [create_test_image('new.jpg')])
+
+        self.assertEqual(images[0].order, 8)
+
+    def test_bulk_append_rejects_over_limit(self):
+        """Test that exceeding the limit raises and writes nothing."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        files = [create_test_image(f'photo{i}.jpg') for i in range(21)]
+
+        with self.assertRaises(ImageLimitExceeded) as ctx:
+            CapturedImage.objects.bulk_append(capture, files)
+
+        self.assertEqual(ctx.exception.current_count, 0)
+        self.assertEqual(capture.images.count(), 0)
+
+
+class ImageCounterTests(CaptureBaseTestCase):
+    """
+    Tests for the denormalized image_count / next_order counters.
+    """
+    def setUp(self):
+        super().setUp()
+        self.capture = CapturedItem.objects.create(owner=self.user)
+        self.url = f'/api/captures/items/{self.capture.short_uuid}/'
+
+    def add_image(self, order):
+        return CapturedImage.objects.create(
+            owner=self.user, captured_item=self.capture,
+            image=create_test_image('img.jpg'), order=order
+        )
+
+    def test_counters_follow_uploads_and_deletes(self):
+        """Test that uploads advance and API deletes decrement the counters."""
+        self.client.post(
+            f'{self.url}upload_images/',
+            {'images': [create_test_image('a.jpg'), create_test_image('b.jpg', color='blue')]},
+            format='multipart'
+        )
+        image = self.capture.images.first()
+        self.client.delete(f'{self.url}images/{image.short_uuid}/')
+
+        self.capture.refresh_from_db()
+        self.assertEqual(self.capture.image_count, 1)
+        # Orders are never reused after a delete
+        self.assertEqual(self.capture.next_order, 2)
+
+    def test_orders_past_small_integer_range(self):
+        """Test that appends keep working once next_order outgrows a smallint."""
+        CapturedItem.objects.filter(pk=self.capture.pk).update(next_order=40000)
+
+        response = self.client.post(
+            f'{self.url}upload_images/',
+            {'images': [create_test_image('a.jpg')]},
+            format='multipart'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.capture.images.get().order, 40000)
+
+    def test_single_create_updates_counters(self):
+        """Test that images created one at a time keep the counters in step."""
+        self.add_image(order=7)
+
+        self.capture.refresh_from_db()
+        self.assertEqual((self.capture.image_count, self.capture.next_order), (1, 8))
+
+    def test_capture_delete_skips_counter_updates(self):
+        """Test that cascading image deletes do not update the doomed capture."""
+        for order in range(3):
+            self.add_image(order)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.delete(self.url)
+
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "captures_captureditem"')]
+        self.assertEqual(updates, [])
+        self.assertFalse(CapturedItem.objects.filter(pk=self.capture.pk).exists())
+
+    def test_patch_during_upload_keeps_counters(self):
+        """Test that a PATCH saving a stale instance does not undo a concurrent upload."""
+        perform_update = CapturedItemViewSet.perform_update
+
+        def upload_then_update(viewset, serializer):
+            # The PATCH has already loaded the capture when the upload commits
+            CapturedImage.objects.bulk_append(
+                CapturedItem.objects.get(pk=self.capture.pk),
+                [create_test_image('a.jpg'), create_test_image('b.jpg', color='blue')]
+            )
+            perform_update(viewset, serializer)
+
+        with mock.patch.object(CapturedItemViewSet, 'perform_update', upload_then_update):
+            response = self.client.patch(self.url, {'voice_transcript': 'Edited'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.capture.refresh_from_db()
+        self.assertEqual(self.capture.voice_transcript, 'Edited')
+        self.assertEqual((self.capture.image_count, self.capture.next_order), (2, 2))
+
+    def test_stale_save_keeps_counters(self):
+        """Test that saving an instance loaded before a delete keeps the new count."""
+        self.add_image(order=0)
+        image = self.add_image(order=1)
+        stale = CapturedItem.objects.get(pk=self.capture.pk)
+        image.delete()
+
+        stale.is_complete = True
+        stale.save()
+
+        self.capture.refresh_from_db()
+        self.assertTrue(self.capture.is_complete)
+        self.assertEqual((self.capture.image_count, self.capture.next_order), (1, 2))
+
+    def test_limit_check_uses_counter(self):
+        """Test that bulk_append checks the limit without counting images."""
+        CapturedItem.objects.filter(pk=self.capture.pk).update(image_count=20)
+
+        with CaptureQueriesContext(connection) as ctx:
+            with self.assertRaises(ImageLimitExceeded):
+                CapturedImage.objects.bulk_append(self.capture, [create_test_image()])
+
+        self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+
+    def test_complete_reads_counter(self):
+        """Test that complete reports the count without a COUNT query."""
+        CapturedImage.objects.bulk_append(self.capture, [create_test_image()])
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(f'{self.url}complete/')
+
+        self.assertEqual(response.data['image_count'], 1)
+        self.assertFalse(any('COUNT(' in q['sql'] for q in ctx.captured_queries))
+
+    def test_reconcile_repairs_drift(self):
+        """Test that the reconcile command fixes drifted counters."""
+        self.add_image(order=4)
+        self.add_image(order=5)
+        CapturedItem.objects.filter(pk=self.capture.pk).update(image_count=9, next_order=1)
+        untouched = CapturedItem.objects.create(owner=self.user)
+
+        out = StringIO()
+        call_command('reconcile_image_counts', '--dry-run', stdout=out)
+        self.capture.refresh_from_db()
+        self.assertEqual(self.capture.image_count, 9)
+        self.assertIn('Found 1 capture(s)', out.getvalue())
+
+        out = StringIO()
+        call_command('reconcile_image_counts', stdout=out)
+        self.capture.refresh_from_db()
+        untouched.refresh_from_db()
+        self.assertEqual((self.capture.image_count, self.capture.next_order), (2, 6))
+        self.assertEqual((untouched.image_count, untouched.next_order), (0, 0))
+        self.assertIn('Reconciled 1 capture(s)', out.getvalue())
+
+
+class DerivativePipelineTests(CaptureBaseTestCase):
+    """
+    Tests for background derivative generation.
+    """
+    def upload(self, capture, *files):
+        return self.client.post(
+            f'/api/captures/items/{capture.short_uuid}/upload_images/',
+            {'images': list(files)},
+            format='multipart'
+        )
+
+    def test_upload_queues_one_job_per_image(self):
+        """Test that uploading images enqueues derivative jobs."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        self.upload(capture, create_test_image('a.jpg'), create_test_image('b.jpg'))
+
+        self.assertEqual(
+            DerivativeJob.objects.filter(image__captured_item=capture, status=DerivativeJob.PENDING).count(),
+            2
+        )
+
+    def test_processing_generates_sized_variants(self):
+        """Test that the worker writes resized variants and clears the queue."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        response = self.upload(capture, create_test_image('big.jpg', size=(2000, 1000)))
+        self.assertEqual(response.data[0]['derivatives'], {})
+
+        self.assertEqual(process_pending_jobs(), 1)
+
+        image = capture.images.get()
+        self.assertEqual(set(image.derivatives), {'thumb', 'medium'})
+        with default_storage.open(image.derivatives['thumb']) as f:
+            thumb = Image.open(f)
+            self.assertEqual(thumb.format, 'WEBP')
+            self.assertEqual(thumb.size, (320, 160))
+        self.assertFalse(DerivativeJob.objects.exists())
+
+    def test_derivative_urls_exposed_in_api(self):
+        """Test that the capture detail includes derivative URLs."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        self.upload(capture, create_test_image('photo.jpg'))
+        process_pending_jobs()
+
+        response = self.client.get(f'/api/captures/items/{capture.short_uuid}/')
+
+        derivatives = response.data['images'][0]['derivatives']
+        self.assertTrue(derivatives['thumb'].endswith('thumb.webp'))
+        self.assertTrue(derivatives['medium'].startswith('http://testserver/media/'))
+
+    def test_capture_page_tiles_use_thumb(self):
+        """Test that the capture page shows thumbs, and originals only while jobs are pending."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        self.upload(capture, create_test_image('photo.jpg'))
+        image = capture.images.get()
+        self.client.force_login(self.user)
+        page = f'/capture/?id={capture.short_uuid}'
+
+        self.assertContains(self.client.get(page), f'src="{image.image.url}"')
+
+        process_pending_jobs()
+        image.refresh_from_db()
+        response = self.client.get(page)
+        self.assertContains(response, f'src="{default_storage.url(image.derivatives["thumb"])}"')
+        self.assertNotContains(response, image.image.url)
+
+    def test_image_deleted_during_generation_leaves_no_files(self):
+        """Test that variants rendered for an image deleted meanwhile are removed."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        self.upload(capture, create_test_image('photo.jpg'))
+        image = capture.images.get()
+        render = derivatives.render_derivative
+
+        def render_then_delete(source, max_side):
+            CapturedImage.objects.filter(pk=image.pk).delete()
+            return render(source, max_side)
+
+        with mock.patch('captures.derivatives.render_derivative', side_effect=render_then_delete):
+            self.assertEqual(process_pending_jobs(), 1)
+
+        self.assertFalse(any(default_storage.exists(name) for name in derivatives.derivative_files(image)))
+        self.assertFalse(DerivativeJob.objects.exists())
+
+    def test_deleting_image_loaded_before_generation_removes_variants(self):
+        """Test that a delete through a stale instance still removes the variants."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        self.upload(capture, create_test_image('photo.jpg'))
+        stale = capture.images.get()
+        process_pending_jobs()
+        names = capture.images.get().derivatives.values()
+        self.assertTrue(all(default_storage.exists(name) for name in names))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            stale.delete()
+
+        self.assertFalse(any(default_storage.exists(name) for name in names))
+
+    def test_jpeg_sources_are_decoded_at_reduced_scale(self):
+        """Test that large JPEGs are decoded no larger than the biggest variant needs."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        self.upload(capture, create_test_image('big.jpg', size=(6000, 3000)))
+        decoded = []
+        transpose = ImageOps.exif_transpose
+
+        def record_size(image):
+            decoded.append(image.size)
+            return transpose(image)
+
+        with mock.patch('captures.derivatives.ImageOps.exif_transpose', side_effect=record_size):
+            process_pending_jobs()
+
+        self.assertEqual(decoded, [(1500, 750)])
+        medium = capture.images.get().derivatives['medium']
+        with default_storage.open(medium) as f:
+            self.assertEqual(Image.open(f).size, (1280, 640))
+
+    def test_claimed_jobs_are_skipped_until_the_claim_expires(self):
+        """Test that a job leased by another worker is only taken over after its lease."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        self.upload(capture, create_test_image('photo.jpg'))
+        job = DerivativeJob.objects.get()
+        job.claimed_until = timezone.now() + timedelta(minutes=5)
+        job.save()
+
+        self.assertFalse(process_next_job())
+
+        DerivativeJob.objects.update(claimed_until=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(process_next_job())
+        self.assertFalse(DerivativeJob.objects.exists())
+
+    def test_failed_jobs_are_retried_then_marked_failed(self):
+        """Test that generation errors are recorded and retried."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        self.upload(capture, create_test_image('photo.jpg'))
+
+        with mock.patch('captures.derivatives.generate_derivatives', side_effect=OSError('disk full')), \
+                self.assertLogs('captures.derivatives', 'ERROR'):
+            with self.settings(CAPTURES_DERIVATIVE_MAX_ATTEMPTS=2):
+                process_next_job()
+                job = DerivativeJob.objects.get()
+                self.assertEqual((job.status, job.attempts), (DerivativeJob.PENDING, 1))
+                process_next_job()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, DerivativeJob.FAILED)
+        self.assertEqual(job.last_error, 'disk full')
+        self.assertFalse(process_next_job())
+
+
+class MediaServingTests(CaptureBaseTestCase):
+    """
+    Tests for authorized media serving.
+    """
+    def setUp(self):
+        super().setUp()
+        self.capture = CapturedItem.objects.create(owner=self.user)
+        self.image = CapturedImage.objects.bulk_append(self.capture, [create_test_image('a.jpg')])[0]
+        self.url = self.image.image.url
+        self.client.force_login(self.user)
+
+    def test_owner_gets_file(self):
+        """Test that the owner receives the file with cache headers."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'private, max-age=31536000, immutable')
+        self.image.image.open()
+        self.assertEqual(b''.join(response.streaming_content), self.image.image.read())
+        self.image.image.close()
+
+    def test_other_users_and_anonymous_get_404(self):
+        """Test that files are hidden from anyone but their owner."""
+        self.client.force_login(self.other_user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_unreferenced_files_are_not_served(self):
+        """Test that only names stored on an owned image are served."""
+        response = self.client.get('/media/derivatives/nope/thumb.webp')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_bearer_token(self):
+        """Test that API clients can fetch files with their token."""
+        self.client.logout()
+        token = issue_token(self.user)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_range_request(self):
+        """Test that a byte range is answered with 206 Partial Content."""
+        size = self.image.image.size
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Range'], f'bytes 2-5/{size}')
+        self.assertEqual(len(b''.join(response.streaming_content)), 4)
+        self.assertEqual(
+            self.client.get(self.url, HTTP_RANGE=f'bytes={size}-').status_code,
+            status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
+    def test_derivative(self):
+        """Test that an image's derivatives are served to its owner."""
+        process_pending_jobs()
+        self.image.refresh_from_db()
+
+        response = self.client.get(default_storage.url(self.image.derivatives['thumb']))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+    @override_settings(CAPTURES_MEDIA_ACCEL_REDIRECT='/protected-media/')
+    def test_accel_redirect(self):
+        """Test that nginx is handed the file instead of Django streaming it."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.image.image.name}')
+        self.assertEqual(response.content, b'')
+
+
+@override_settings(CAPTURES_UPLOAD_MAX_CHUNK_SIZE=1024)
+class ResumableUploadTests(CaptureBaseTestCase):
+    """
+    Tests for chunked, resumable uploads.
+    """
+    def setUp(self):
+        super().setUp()
+        self.capture = CapturedItem.objects.create(owner=self.user)
+        self.data = create_test_image('photo.jpg', size=(200, 200)).read()
+        self.base = f'/api/captures/items/{self.capture.short_uuid}/uploads/'
+
+    def create_session(self, size=None):
+        response = self.client.post(
+            self.base,
+            {'filename': 'photo.jpg', 'size': size or len(self.data)},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['short_uuid']
+
+    def put_chunk(self, session, offset, chunk):
+        return self.client.put(
+            f'{self.base}{session}/',
+            data=chunk,
+            content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def upload_all(self, session):
+        for offset in range(0, len(self.data), 1024):
+            response = self.put_chunk(session, offset, self.data[offset:offset + 1024])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_chunked_upload_creates_image(self):
+        """Test that chunks are assembled and finalized into a CapturedImage."""
+        session = self.create_session()
+        self.upload_all(session)
+
+        response = self.client.post(f'{self.base}{session}/finalize/')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['order'], 0)
+        image = self.capture.images.get()
+        with image.image.open('rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_resume_after_interrupted_chunk(self):
+        """Test that the client can read the offset and resume from it."""
+        session = self.create_session()
+        self.put_chunk(session, 0, self.data[:1024])
+
+        # Retrying an already-stored chunk reports the current offset
+        response = self.put_chunk(session, 0, self.data[:1024])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['offset'], 1024)
+
+        response = self.client.get(f'{self.base}{session}/')
+        self.assertEqual(response.data['offset'], 1024)
+
+        for offset in range(1024, len(self.data), 1024):
+            self.put_chunk(session, offset, self.data[offset:offset + 1024])
+        response = self.client.post(f'{self.base}{session}/finalize/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_finalize_locks_session_and_adds_one_image(self):
+        """Test that finalize locks the session, so a repeated call finds it gone."""
+        session = self.create_session()
+        self.upload_all(session)
+        temp_path = UploadSession.objects.get().temp_path
+
+        with mock.patch.object(QuerySet, 'select_for_update', autospec=True,
+                               side_effect=QuerySet.select_for_update) as select_for_update:
+            with self.captureOnCommitCallbacks(execute=True):
+                first = self.client.post(f'{self.base}{session}/finalize/')
+        second = self.client.post(f'{self.base}{session}/finalize/')
+
+        self.assertIn(UploadSession, [c.args[0].model for c in select_for_update.call_args_list])
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.capture.images.count(), 1)
+        self.assertFalse(os.path.exists(temp_path))
+
+    def test_finalize_incomplete_upload_fails(self):
+        """Test that finalizing before all bytes arrive is rejected."""
+        session = self.create_session()
+        self.put_chunk(session, 0, self.data[:1024])
+
+        response = self.client.post(f'{self.base}{session}/finalize/')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.capture.images.count(), 0)
+
+    def test_oversized_chunk_rejected(self):
+        """Test that chunks above the configured maximum are refused."""
+        session = self.create_session()
+        response = self.put_chunk(session, 0, self.data[:2048])
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    def test_finalize_rejects_invalid_image(self):
+        """Test that assembled files go through image validation."""
+        self.data = b'not an image' * 50
+        session = self.create_session()
+        self.upload_all(session)
+
+        response = self.client.post(f'{self.base}{session}/finalize/')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.capture.images.count(), 0)
+
+    def test_sessions_scoped_to_owner(self):
+        """Test that other users cannot see or write to a session."""
+        session = self.create_session()
+        self.client.force_authenticate(user=self.other_user)
+
+        self.assertEqual(
+            self.client.get(f'{self.base}{session}/').status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+        self.assertEqual(
+            self.put_chunk(session, 0, self.data[:1024]).status_code,
+            status.HTTP_404_NOT_FOUND
+        )
+
+
+class ContentAddressedStorageTests(CaptureBaseTestCase):
+    """
+    Tests for deduplicated, content-addressed image storage.
+    """
+    def setUp(self):
+        super().setUp()
+        self.capture = CapturedItem.objects.create(owner=self.user)
+
+    def upload(self, *files):
+        return self.client.post(
+            f'/api/captures/items/{self.capture.short_uuid}/upload_images/',
+            {'images': list(files)},
+            format='multipart'
+        )
+
+    def test_files_named_by_content_hash(self):
+        """Test that the stored name is derived from the content digest."""
+        image = create_test_image('photo.jpg', color='purple')
+        digest = hashlib.sha256(image.read()).hexdigest()
+        image.seek(0)
+
+        self.upload(image)
+
+        stored = self.capture.images.get()
+        self.assertEqual(stored.image.name, f'cas/{digest[:2]}/{digest[2:4]}/{digest}.jpg')
+
+    def test_identical_uploads_share_one_file(self):
+        """Test that re-uploading the same photo does not store it twice."""
+        self.upload(create_test_image('first.jpg', color='teal'))
+        self.upload(create_test_image('retry.jpg', color='teal'))
+        self.upload(create_test_image('other.jpg', color='navy'))
+
+        names = list(self.capture.images.values_list('image', flat=True))
+        self.assertEqual(len(names), 3)
+        self.assertEqual(names[0], names[1])
+        self.assertNotEqual(names[0], names[2])
+
+    def test_blob_deleted_with_last_reference(self):
+        """Test that a shared blob survives until its last image is deleted."""
+        self.upload(create_test_image('a.jpg', color='olive'), create_test_image('b.jpg', color='olive'))
+        first, second = self.capture.images.all()
+        storage = first.image.storage
+        name = first.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(storage.exists(name))
+
+    def test_concurrent_writer_never_creates_a_duplicate(self):
+        """Test that a blob appearing after the exists() check is not stored under a new name."""
+        self.upload(create_test_image('first.jpg', color='gold'))
+        name = self.capture.images.get().image.name
+        storage = CapturedImage._meta.get_field('image').storage
+
+        with mock.patch.object(storage, 'exists', return_value=False):
+            saved = storage.save('retry.jpg', create_test_image('retry.jpg', color='gold'))
+
+        self.assertEqual(saved, name)
+        self.assertEqual(storage.listdir(os.path.dirname(name))[1], [os.path.basename(name)])
+
+    def test_blob_kept_if_reused_while_waiting_for_lock(self):
+        """Test that the last-reference check runs under the blob lock."""
+        self.upload(create_test_image('a.jpg', color='lime'))
+        image = self.capture.images.get()
+        storage = image.image.storage
+        name = image.image.name
+
+        def upload_commits_first(locked_name):
+            # An upload of the same bytes held the lock and commits its row
+            CapturedImage.objects.bulk_create([
+                CapturedImage(owner=self.user, captured_item=self.capture, image=locked_name, order=1)
+            ])
+
+        with mock.patch('captures.signals.lock_blob', side_effect=upload_commits_first) as lock_blob:
+            with self.captureOnCommitCallbacks(execute=True):
+                image.delete()
+
+        lock_blob.assert_called_once_with(name)
+        self.assertTrue(storage.exists(name))
+
+    def test_derivatives_deleted_with_image(self):
+        """Test that an image's derivative files are removed with it."""
+        self.upload(create_test_image('photo.jpg', color='maroon'))
+        process_pending_jobs()
+        image = self.capture.images.get()
+        derivative_names = list(image.derivatives.values())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.delete()
+
+        for name in derivative_names:
+            self.assertFalse(default_storage.exists(name))
+
+
 class ImageDeleteTests(CaptureBaseTestCase):
     """
     Tests for image deletion functionality.
@@ -370,6 +1749,454 @@ class ImageReorderTests(CaptureBaseTestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+    def test_reorder_uses_single_update(self):
+        """Test that a full permutation is written with one UPDATE."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        images = [
+            CapturedImage.objects.create(
+                owner=self.user, captured_item=capture,
+                image=create_test_image(f'img{i}.jpg'), order=i
+            )
+            for i in range(4)
+        ]
+
+        new_order = [str(img.uuid) for img in reversed(images)]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.patch(
+                f'/api/captures/items/{capture.short_uuid}/reorder/',
+                {'order': new_order},
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        orders = list(capture.images.values_list('uuid', flat=True))
+        self.assertEqual([str(u) for u in orders], new_order)
+
+
+class ImageMoveTests(CaptureBaseTestCase):
+    """
+    Tests for moving a single image within a capture.
+    """
+    def setUp(self):
+        super().setUp()
+        self.capture = CapturedItem.objects.create(owner=self.user)
+        self.images = [
+            CapturedImage.objects.create(
+                owner=self.user, captured_item=self.capture,
+                image=create_test_image(f'img{i}.jpg'), order=i
+            )
+            for i in range(4)
+        ]
+
+    def move(self, image, before=None):
+        return self.client.patch(
+            f'/api/captures/items/{self.capture.short_uuid}/move/',
+            {'image': str(image.uuid), 'before': str(before.uuid) if before else None},
+            format='json'
+        )
+
+    def current_order(self):
+        return list(self.capture.images.values_list('id', flat=True))
+
+    def test_move_image_before_another(self):
+        """Test moving the last image to the front."""
+        img0, img1, img2, img3 = self.images
+
+        response = self.move(img3, before=img0)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['moved'])
+        self.assertEqual(self.current_order(), [img3.id, img0.id, img1.id, img2.id])
+
+    def test_move_image_to_end(self):
+        """Test that a null 'before' moves the image to the end."""
+        img0, img1, img2, img3 = self.images
+
+        response = self.move(img0)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.current_order(), [img1.id, img2.id, img3.id, img0.id])
+
+    def test_move_only_touches_affected_rows(self):
+        """Test that swapping neighbours updates just those two rows."""
+        img0, img1, img2, img3 = self.images
+
+        response = self.move(img2, before=img1)
+
+        self.assertEqual(response.data['count'], 2)
+        img0.refresh_from_db()
+        img3.refresh_from_db()
+        self.assertEqual(img0.updated_at, self.images[0].updated_at)
+        self.assertEqual(img3.updated_at, self.images[3].updated_at)
+        self.assertEqual(self.current_order(), [img0.id, img2.id, img1.id, img3.id])
+
+    def test_move_with_foreign_image_fails(self):
+        """Test that moving relative to another capture's image fails."""
+        other_capture = CapturedItem.objects.create(owner=self.user)
+        other_img = CapturedImage.objects.create(
+            owner=self.user, captured_item=other_capture,
+            image=create_test_image('other.jpg'), order=0
+        )
+
+        response = self.move(self.images[0], before=other_img)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('error', response.data)
+
+    def test_move_other_users_capture_fails(self):
+        """Test that users cannot move images in other users' captures."""
+        self.client.force_authenticate(user=self.other_user)
+
+        response = self.move(self.images[1], before=self.images[0])
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TranscriptDeltaTests(CaptureBaseTestCase):
+    """
+    Tests for delta edits to voice_transcript.
+    """
+    def setUp(self):
+        super().setUp()
+        self.capture = CapturedItem.objects.create(owner=self.user, voice_transcript='Buy milk')
+        self.url = f'/api/captures/items/{self.capture.short_uuid}/transcript/'
+
+    def patch_delta(self, revision, *ops):
+        return self.client.patch(self.url, {'revision': revision, 'ops': list(ops)}, format='json')
+
+    def test_apply_ops_in_sequence(self):
+        """Test that ops apply in order and bump the revision."""
+        response = self.patch_delta(
+            0,
+            {'offset': 8, 'insert': ' and eggs'},
+            {'offset': 0, 'delete': 3, 'insert': 'Get'},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'revision': 1, 'length': 17})
+        self.capture.refresh_from_db()
+        self.assertEqual(self.capture.voice_transcript, 'Get milk and eggs')
+        self.assertEqual(self.capture.transcript_revision, 1)
+
+    def test_offsets_count_code_points(self):
+        """Test that non-BMP characters count as one position."""
+        CapturedItem.objects.filter(pk=self.capture.pk).update(voice_transcript='🥛 milk')
+
+        self.patch_delta(0, {'offset': 1, 'delete': 5, 'insert': ' oat milk'})
+
+        self.capture.refresh_from_db()
+        self.assertEqual(self.capture.voice_transcript, '🥛 oat milk')
+
+    def test_stale_revision_conflicts(self):
+        """Test that an edit against an old revision is rejected with the current one."""
+        self.patch_delta(0, {'offset': 8, 'insert': '!'})
+
+        response = self.patch_delta(0, {'offset': 0, 'delete': 8})
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['revision'], 1)
+        self.capture.refresh_from_db()
+        self.assertEqual(self.capture.voice_transcript, 'Buy milk!')
+
+    def test_out_of_range_op_rejected(self):
+        """Test that an op past the end of the text changes nothing."""
+        response = self.patch_delta(0, {'offset': 5, 'delete': 10})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.capture.refresh_from_db()
+        self.assertEqual((self.capture.voice_transcript, self.capture.transcript_revision), ('Buy milk', 0))
+
+    def test_full_patch_bumps_revision(self):
+        """Test that replacing the whole transcript invalidates older deltas."""
+        response = self.client.patch(
+            f'/api/captures/items/{self.capture.short_uuid}/',
+            {'voice_transcript': 'Replaced'}
+        )
+        self.assertEqual(response.data['transcript_revision'], 1)
+
+        self.assertEqual(self.patch_delta(0, {'offset': 0, 'insert': 'x'}).status_code, status.HTTP_409_CONFLICT)
+
+    def test_other_users_capture_not_found(self):
+        """Test that users cannot edit other users' transcripts."""
+        other = CapturedItem.objects.create(owner=self.other_user)
+
+        response = self.client.patch(
+            f'/api/captures/items/{other.short_uuid}/transcript/',
+            {'revision': 0, 'ops': [{'offset': 0, 'insert': 'x'}]},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(CAPTURES_TRANSCRIPT_WRITE_BEHIND=True)
+class TranscriptWriteBehindTests(CaptureBaseTestCase):
+    """
+    Tests for write-behind buffering of transcript autosaves.
+
+    The buffer is the production backend in a temporary directory. Flush
+    timers are replaced with a mock; tests fire them by hand.
+    """
+    def setUp(self):
+        super().setUp()
+        buffer_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(buffer_dir.cleanup)
+        buffer_settings = self.settings(
+            CACHES={
+                **settings.CACHES,
+                'transcripts': {
+                    'BACKEND': 'core.cache.DurableFileBasedCache',
+                    'LOCATION': buffer_dir.name,
+                },
+            },
+            CAPTURES_TRANSCRIPT_BUFFER_CACHE='transcripts',
+        )
+        buffer_settings.enable()
+        self.addCleanup(buffer_settings.disable)
+        transcripts._scheduled.clear()
+        patcher = mock.patch('captures.transcripts.threading.Timer')
+        self.timer = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.capture = CapturedItem.objects.create(owner=self.user, voice_transcript='Saved')
+        self.url = f'/api/captures/items/{self.capture.short_uuid}/'
+
+    def fire_timers(self):
+        # Run the flush the timer would, minus closing the thread's DB connection
+        for call in self.timer.call_args_list:
+            self.assertIs(call.args[1], transcripts._timed_flush)
+            transcripts._scheduled.discard(*call.args[2])
+            transcripts.flush_transcript(*call.args[2])
+        self.timer.reset_mock()
+
+    def saved(self):
+        self.capture.refresh_from_db()
+        return self.capture.voice_transcript, self.capture.transcript_revision
+
+    def test_burst_is_acknowledged_without_writes(self):
+        """Test that autosave bursts are buffered and flushed as one UPDATE."""
+        with CaptureQueriesContext(connection) as ctx, \
+                mock.patch.object(QuerySet, 'select_for_update') as select_for_update:
+            for text in ['B', 'Bu', 'Buy milk']:
+                response = self.client.patch(self.url, {'voice_transcript': text})
+                self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+        self.assertFalse(any(q['sql'].startswith('UPDATE') for q in ctx.captured_queries))
+        select_for_update.assert_not_called()
+        self.assertEqual(response.data['transcript_revision'], 3)
+        self.assertEqual(self.saved(), ('Saved', 0))
+        self.assertEqual(self.timer.call_count, 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.fire_timers()
+
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.saved(), ('Buy milk', 3))
+
+    def test_deltas_apply_to_buffered_text(self):
+        """Test that delta edits see buffered writes and still detect stale revisions."""
+        self.client.patch(self.url, {'voice_transcript': 'Buy milk'})
+
+        response = self.client.patch(
+            f'{self.url}transcript/',
+            {'revision': 1, 'ops': [{'offset': 8, 'insert': '!'}]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['revision'], 2)
+
+        stale = self.client.patch(
+            f'{self.url}transcript/',
+            {'revision': 1, 'ops': [{'offset': 0, 'delete': 3}]},
+            format='json'
+        )
+        self.assertEqual(stale.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(stale.data['revision'], 2)
+
+        self.fire_timers()
+        self.assertEqual(self.saved(), ('Buy milk!', 2))
+
+    def test_complete_flushes(self):
+        """Test that completing a capture saves its buffered transcript first."""
+        self.client.patch(self.url, {'voice_transcript': 'Final words'})
+
+        self.client.post(f'{self.url}complete/')
+
+        self.assertEqual(self.saved(), ('Final words', 1))
+        self.assertTrue(CapturedItem.objects.get(pk=self.capture.pk).is_complete)
+
+    def test_reads_flush_when_accepting_process_is_gone(self):
+        """Test that another worker's detail read or page load saves the pending entry."""
+        self.client.patch(self.url, {'voice_transcript': 'From the API'})
+        # The process holding the timer died before it fired
+        transcripts._scheduled.clear()
+        self.timer.reset_mock()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['voice_transcript'], 'From the API')
+        self.assertEqual(self.saved(), ('From the API', 1))
+
+        self.client.patch(self.url, {'voice_transcript': 'From the page'})
+        transcripts._scheduled.clear()
+        page_client = APIClient()
+        page_client.force_login(self.user)
+        page_client.get(f'/capture/?id={self.capture.short_uuid}')
+        self.assertEqual(self.saved(), ('From the page', 2))
+
+    def test_process_exit_flushes_scheduled(self):
+        """Test that the atexit hook writes everything with a pending timer."""
+        self.client.patch(self.url, {'voice_transcript': 'Before shutdown'})
+
+        transcripts.flush_scheduled_transcripts()
+
+        self.assertEqual(self.saved(), ('Before shutdown', 1))
+
+    def test_mixed_patch_is_written_directly(self):
+        """Test that a PATCH with other fields flushes, then updates the row."""
+        self.client.patch(self.url, {'voice_transcript': 'Buffered'})
+
+        response = self.client.patch(self.url, {'voice_transcript': 'Direct', 'is_complete': True})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.saved(), ('Direct', 2))
+        self.fire_timers()
+        self.assertEqual(self.saved(), ('Direct', 2))
+
+    def test_losing_writer_reapplies_its_edit(self):
+        """Test that a writer whose revision was claimed first rebuilds on the winner's text."""
+        self.client.patch(self.url, {'voice_transcript': 'Buy milk'})
+        stale = CapturedItem.objects.get(pk=self.capture.pk)
+        # Another worker claims revision 2 after this one has read revision 1
+        real_add = transcripts.get_transcript_buffer().add
+
+        def add_after_other_writer(key, value, timeout):
+            if value['revision'] == 2 and not add_after_other_writer.raced:
+                add_after_other_writer.raced = True
+                real_add(key, {**value, 'text': 'Buy milk and eggs'}, timeout)
+            return real_add(key, value, timeout)
+        add_after_other_writer.raced = False
+
+        def append_bread(capture):
+            capture.voice_transcript += ', bread'
+            capture.transcript_revision += 1
+
+        with mock.patch.object(transcripts.get_transcript_buffer(), 'add', add_after_other_writer):
+            transcripts.stage_transcript(stale, append_bread)
+
+        self.assertEqual((stale.voice_transcript, stale.transcript_revision), ('Buy milk and eggs, bread', 3))
+        self.fire_timers()
+        self.assertEqual(self.saved(), ('Buy milk and eggs, bread', 3))
+
+    def test_writer_that_read_row_before_flush_builds_on_it(self):
+        """Test that flushed revisions stay claimed for writers holding the old row."""
+        stale = CapturedItem.objects.get(pk=self.capture.pk)
+        self.client.patch(self.url, {'voice_transcript': 'Flushed'})
+        self.fire_timers()
+
+        def replace(capture):
+            capture.voice_transcript = 'Newer'
+            capture.transcript_revision += 1
+
+        transcripts.stage_transcript(stale, replace)
+
+        self.assertEqual(stale.transcript_revision, 2)
+        self.fire_timers()
+        self.assertEqual(self.saved(), ('Newer', 2))
+
+    def test_sweeper_flushes_orphaned_entries(self):
+        """Test that flush_transcripts saves entries whose timer was lost."""
+        self.client.patch(self.url, {'voice_transcript': 'Orphaned'})
+        # The process holding the timer died before it fired
+        transcripts._scheduled.clear()
+        self.timer.reset_mock()
+
+        call_command('flush_transcripts', '--once', '--min-age', '60', stdout=StringIO())
+        self.assertEqual(self.saved(), ('Saved', 0))
+
+        out = StringIO()
+        call_command('flush_transcripts', '--once', '--min-age', '0', stdout=out)
+        self.assertEqual(self.saved(), ('Orphaned', 1))
+        self.assertIn('Flushed 1 transcript(s)', out.getvalue())
+
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('flush_transcripts', '--once', '--min-age', '0', stdout=StringIO())
+        self.assertFalse(any(q['sql'].startswith('UPDATE') for q in ctx.captured_queries))
+
+    def test_sweeper_discards_entries_of_deleted_captures(self):
+        """Test that pending transcripts for a deleted capture are dropped."""
+        self.client.patch(self.url, {'voice_transcript': 'Gone'})
+        self.client.delete(self.url)
+
+        self.fire_timers()
+        call_command('flush_transcripts', '--once', '--min-age', '0', stdout=StringIO())
+
+        self.assertEqual(list(transcripts.get_transcript_buffer().values()), [])
+
+    @override_settings(CAPTURES_TRANSCRIPT_BUFFER_CACHE='default')
+    def test_sweeper_requires_listable_buffer(self):
+        """Test that flush_transcripts refuses a buffer cache it cannot list."""
+        with self.assertRaises(CommandError):
+            call_command('flush_transcripts', '--once', stdout=StringIO())
+
+
+class TranscriptSearchTests(CaptureBaseTestCase):
+    """
+    Tests for transcript search. The test database is SQLite, so these
+    exercise the substring fallback rather than the tsvector path.
+    """
+    url = '/api/captures/items/search/'
+
+    def test_search_matches_own_captures(self):
+        """Test that search returns only the user's matching captures."""
+        match = CapturedItem.objects.create(owner=self.user, voice_transcript='Call the plumber')
+        CapturedItem.objects.create(owner=self.user, voice_transcript='Buy milk')
+        CapturedItem.objects.create(owner=self.other_user, voice_transcript='Plumber invoice')
+
+        response = self.client.get(self.url, {'q': 'plumber'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([r['short_uuid'] for r in results], [match.short_uuid])
+        self.assertEqual(results[0]['snippet'], 'Call the plumber')
+
+    def test_limit(self):
+        """Test that limit caps the number of results."""
+        for i in range(3):
+            CapturedItem.objects.create(owner=self.user, voice_transcript=f'note {i}')
+
+        response = self.client.get(self.url, {'q': 'note', 'limit': 2})
+
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_snippet_is_escaped(self):
+        """Test that transcript text is HTML-escaped in snippets."""
+        CapturedItem.objects.create(owner=self.user, voice_transcript='<script>alert(1)</script> todo')
+
+        response = self.client.get(self.url, {'q': 'todo'})
+
+        self.assertEqual(
+            response.data['results'][0]['snippet'],
+            '&lt;script&gt;alert(1)&lt;/script&gt; todo'
+        )
+
+    def test_highlight_markers_become_mark_tags(self):
+        """Test that SearchHeadline delimiters are rendered as <mark> after escaping."""
+        capture = CapturedItem.objects.create(owner=self.user)
+        capture.snippet = 'fix the \x02<sink>\x03'
+        capture.rank = 0.5
+
+        data = CaptureSearchResultSerializer(capture).data
+
+        self.assertEqual(data['snippet'], 'fix the <mark>&lt;sink&gt;</mark>')
+
+    def test_query_required(self):
+        """Test that a missing or blank q is rejected."""
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'q': ' '}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class CompleteCaptureTests(CaptureBaseTestCase):
     """
     Tests for marking captures as complete.
@@ -450,6 +2277,9 @@ class CapturePageViewTests(TestCase):
     Tests for the capture page view.
     """
     def setUp(self):
+        use_temp_file_dirs(self)
+        # User ids repeat across tests, so cached users must not carry over
+        cache.clear()
         self.user = User.objects.create_user(
             username='testuser',
             password='testpass123'
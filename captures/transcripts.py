@@ -0,0 +1,227 @@
+"""
+Write-behind buffering for voice_transcript autosaves.
+
+With CAPTURES_TRANSCRIPT_WRITE_BEHIND enabled, transcript-only writes (a
+PATCH of just voice_transcript, or a delta edit) are staged in a shared
+cache and acknowledged with 202 Accepted. The database row is written once
+per flush instead of once per keystroke burst.
+
+Each staged revision is its own entry, claimed with the cache's atomic
+add(): a writer reads the saved row, overlays the newest staged revision,
+applies its edit and adds the next revision. Of several writers that built
+on the same revision exactly one wins; the others reload and reapply their
+edit (or, for a delta made against an older revision, get a conflict). No
+row lock is taken, so a keystroke costs one SELECT and a few cache
+operations. A flush UPDATEs the row to the newest staged revision, unless
+the row already has it, and lets the flushed entries expire after
+FLUSHED_ENTRY_TIMEOUT seconds; until then a writer that read the row just
+before the flush still finds them instead of reclaiming a flushed revision.
+
+Durability:
+
+- A pending transcript is written within CAPTURES_TRANSCRIPT_FLUSH_INTERVAL
+  seconds by a timer in the process that accepted it.
+- It is written immediately when the capture is completed, fetched through
+  the detail endpoint, or updated together with other fields, and when the
+  accepting process exits normally.
+- Anything a timer missed, e.g. because the accepting process died, is
+  written by `manage.py flush_transcripts`, which also drops the entries of
+  deleted captures.
+- An acknowledged transcript is lost only if the cache loses the entry
+  before one of those flushes, e.g. when the cache is wiped, or when the
+  buffer is a per-process cache such as LocMemCache and the process dies.
+  CAPTURES_TRANSCRIPT_BUFFER_CACHE must therefore name a cache that is
+  shared by every worker, survives restarts, never evicts and has an atomic
+  add(). Production uses core.cache.DurableFileBasedCache on a volume,
+  which flush_transcripts can also list.
+
+Until a flush, the capture list and the updated_at/ETag of the capture
+still show the previously saved transcript.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.utils import timezone
+from captures.cache import invalidate_owner
+from captures.models import CapturedItem
+
+logger = logging.getLogger(__name__)
+
+# How long flushed revisions stay claimed (seconds)
+FLUSHED_ENTRY_TIMEOUT = 300
+
+# Captures with a flush timer pending in this process
+_scheduled = set()
+_scheduled_lock = threading.Lock()
+
+
+def write_behind_enabled():
+    return settings.CAPTURES_TRANSCRIPT_WRITE_BEHIND
+
+
+def get_transcript_buffer():
+    return caches[settings.CAPTURES_TRANSCRIPT_BUFFER_CACHE]
+
+
+def pending_key(short_uuid, revision):
+    return f'captures:transcript:{short_uuid}:{revision}'
+
+
+def newest_entry(buffer, short_uuid, revision):
+    """Return the newest revision staged after `revision`, or None."""
+    newest = None
+    while True:
+        entry = buffer.get(pending_key(short_uuid, revision + 1))
+        if entry is None:
+            return newest
+        newest = entry
+        revision += 1
+
+
+def load_pending_transcript(capture):
+    """
+    Overlay the newest staged transcript onto `capture`, as read from the database.
+
+    Returns True if one was pending.
+    """
+    entry = newest_entry(get_transcript_buffer(), capture.short_uuid, capture.transcript_revision)
+    if entry is None:
+        return False
+    capture.voice_transcript = entry['text']
+    capture.transcript_revision = entry['revision']
+    return True
+
+
+def stage_transcript(capture, edit):
+    """
+    Apply `edit` to the newest state of `capture`'s transcript and stage the result.
+
+    `capture` is the row as read from the database, with at least its
+    transcript fields loaded, and is left holding the staged state.
+    `edit(capture)` must change voice_transcript and advance
+    transcript_revision by one; an exception from it aborts the edit with
+    nothing staged. It is called again whenever another writer claims the
+    revision first.
+    """
+    buffer = get_transcript_buffer()
+    saved = capture.voice_transcript, capture.transcript_revision
+    while True:
+        capture.voice_transcript, capture.transcript_revision = saved
+        load_pending_transcript(capture)
+        edit(capture)
+        claimed = buffer.add(
+            pending_key(capture.short_uuid, capture.transcript_revision),
+            {
+                'short_uuid': capture.short_uuid,
+                'text': capture.voice_transcript,
+                'revision': capture.transcript_revision,
+                'staged_at': time.time(),
+            },
+            timeout=None,
+        )
+        if claimed:
+            break
+    schedule_flush(capture.short_uuid)
+
+
+def flush_transcript(short_uuid, owner_id=None):
+    """
+    Write a pending transcript to the database.
+
+    If owner_id is given, captures belonging to anyone else are left alone.
+    Returns True if a transcript was written.
+    """
+    captures = CapturedItem.objects.filter(short_uuid=short_uuid)
+    if owner_id is not None:
+        captures = captures.filter(owner_id=owner_id)
+    row = captures.values('pk', 'owner_id', 'transcript_revision').first()
+    if row is None:
+        return False
+
+    buffer = get_transcript_buffer()
+    entry = newest_entry(buffer, short_uuid, row['transcript_revision'])
+    if entry is None:
+        return False
+    # A concurrent flush may have written this revision, or a newer one
+    written = CapturedItem.objects.filter(
+        pk=row['pk'], transcript_revision__lt=entry['revision']
+    ).update(
+        voice_transcript=entry['text'],
+        transcript_revision=entry['revision'],
+        updated_at=timezone.now(),
+    )
+    if written:
+        invalidate_owner(row['owner_id'])
+    for revision in range(row['transcript_revision'] + 1, entry['revision'] + 1):
+        buffer.touch(pending_key(short_uuid, revision), FLUSHED_ENTRY_TIMEOUT)
+    return bool(written)
+
+
+def sweep_transcripts(min_age):
+    """
+    Flush every capture with a revision staged more than `min_age` seconds ago.
+
+    Picks up what flush timers missed, e.g. when the accepting process
+    died, and drops the entries of deleted captures. The buffer cache must
+    be able to list its entries (core.cache.DurableFileBasedCache).
+    Returns the number of transcripts written.
+    """
+    buffer = get_transcript_buffer()
+    cutoff = time.time() - min_age
+    staged = {}
+    for entry in buffer.values():
+        if entry['staged_at'] <= cutoff:
+            staged.setdefault(entry['short_uuid'], []).append(entry['revision'])
+
+    saved = dict(
+        CapturedItem.objects.filter(short_uuid__in=staged)
+        .values_list('short_uuid', 'transcript_revision')
+    )
+    written = 0
+    for short_uuid, revisions in staged.items():
+        if short_uuid not in saved:
+            buffer.delete_many([pending_key(short_uuid, revision) for revision in revisions])
+        elif max(revisions) > saved[short_uuid] and flush_transcript(short_uuid):
+            written += 1
+    return written
+
+
+def schedule_flush(short_uuid):
+    """Start a flush timer for the capture unless this process already has one."""
+    with _scheduled_lock:
+        if short_uuid in _scheduled:
+            return
+        _scheduled.add(short_uuid)
+    timer = threading.Timer(settings.CAPTURES_TRANSCRIPT_FLUSH_INTERVAL, _timed_flush, [short_uuid])
+    timer.daemon = True
+    timer.start()
+
+
+def _timed_flush(short_uuid):
+    with _scheduled_lock:
+        _scheduled.discard(short_uuid)
+    try:
+        flush_transcript(short_uuid)
+    except Exception:
+        # The entry stays buffered for the next flush trigger
+        logger.exception("Transcript flush failed for capture %s", short_uuid)
+    finally:
+        connection.close()
+
+
+@atexit.register
+def flush_scheduled_transcripts():
+    """Flush everything this process still has timers for."""
+    with _scheduled_lock:
+        pending = list(_scheduled)
+        _scheduled.clear()
+    for short_uuid in pending:
+        try:
+            flush_transcript(short_uuid)
+        except Exception:
+            logger.exception("Transcript flush failed for capture %s", short_uuid)
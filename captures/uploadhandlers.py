@@ -0,0 +1,143 @@
+"""
+Streaming upload handlers for image uploads.
+
+Django's default handlers spool the whole request body to memory or a temp
+file before any validator runs. These handlers inspect each file as it
+streams in and abort the upload as soon as it is clearly unacceptable:
+
+- the request's Content-Length exceeds what a full batch could need
+- a file has a disallowed extension
+- a file's leading bytes aren't a JPEG/PNG/WebP signature
+- a file grows past MAX_FILE_SIZE
+
+The content is also hashed incrementally; accepted files carry the hex
+SHA-256 digest as `file.sha256`.
+
+Full validation (validate_image_file) still runs on accepted files.
+"""
+
+import hashlib
+import os
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    StopUpload,
+    TemporaryFileUploadHandler,
+)
+from rest_framework import status
+from captures.models import MAX_IMAGES_PER_CAPTURE
+from captures.validators import (
+    ALLOWED_EXTENSIONS,
+    MAX_FILE_SIZE,
+    SIGNATURE_SIZE,
+    sniff_image_type,
+)
+
+# Largest request body a full batch can legitimately need (plus multipart overhead)
+MAX_REQUEST_SIZE = MAX_FILE_SIZE * MAX_IMAGES_PER_CAPTURE + 1024 * 1024
+
+
+class UploadRejected(Exception):
+    """Why a streaming upload was aborted, with the HTTP status to report."""
+    def __init__(self, message, status_code=status.HTTP_400_BAD_REQUEST):
+        self.status_code = status_code
+        super().__init__(message)
+
+
+class ImageStreamCheckMixin:
+    """
+    Inspect and hash file data on its way through an upload handler.
+
+    Subclasses decide via `inspecting` whether this handler is the one
+    actually receiving the data, so each file is checked exactly once.
+    """
+    rejection = None
+
+    @property
+    def inspecting(self):
+        return True
+
+    def reject(self, message, status_code=status.HTTP_400_BAD_REQUEST):
+        """Record the reason and stop reading the request body."""
+        self.rejection = UploadRejected(message, status_code)
+        raise StopUpload(connection_reset=True)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Raising here would escape the parser, so defer the rejection to new_file()
+        self.request_too_large = content_length > MAX_REQUEST_SIZE
+        return super().handle_raw_input(input_data, META, content_length, boundary, encoding)
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        if self.inspecting:
+            if self.request_too_large:
+                self.reject(
+                    f"Upload too large. Maximum request size is {MAX_REQUEST_SIZE // (1024*1024)}MB.",
+                    status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
+            ext = os.path.splitext(file_name)[1].lower()
+            if ext not in ALLOWED_EXTENSIONS:
+                self.reject(
+                    f"Unsupported file extension: {ext}. "
+                    f'Allowed extensions: {", ".join(ALLOWED_EXTENSIONS)}'
+                )
+        self.header = b''
+        self.hasher = hashlib.sha256()
+        super().new_file(field_name, file_name, *args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.inspecting:
+            if start + len(raw_data) > MAX_FILE_SIZE:
+                self.reject(
+                    f"Image file too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB.",
+                    status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
+            if len(self.header) < SIGNATURE_SIZE:
+                self.header += raw_data[:SIGNATURE_SIZE - len(self.header)]
+                if len(self.header) == SIGNATURE_SIZE:
+                    self.check_signature()
+            self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if self.inspecting and len(self.header) < SIGNATURE_SIZE:
+            # File shorter than a signature
+            self.check_signature()
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.hasher.hexdigest()
+        return file
+
+    def check_signature(self):
+        if sniff_image_type(self.header) is None:
+            self.reject(
+                f'Invalid file type for "{self.file_name}". '
+                f"Only JPEG, PNG and WebP images are allowed."
+            )
+
+
+class ImageMemoryUploadHandler(ImageStreamCheckMixin, MemoryFileUploadHandler):
+    """In-memory handler for small requests, with streaming image checks."""
+
+    @property
+    def inspecting(self):
+        # When not activated, data passes through to the next handler
+        return self.activated
+
+
+class ImageTemporaryUploadHandler(ImageStreamCheckMixin, TemporaryFileUploadHandler):
+    """Temp-file handler for large requests, with streaming image checks."""
+
+
+def image_upload_handlers(request):
+    """Return the handler chain to install on a Django HttpRequest."""
+    return [
+        ImageMemoryUploadHandler(request),
+        ImageTemporaryUploadHandler(request),
+    ]
+
+
+def get_upload_rejection(request):
+    """Return the UploadRejected raised while parsing the request, if any."""
+    for handler in request.upload_handlers:
+        if getattr(handler, 'rejection', None) is not None:
+            return handler.rejection
+    return None
@@ -5,39 +5,98 @@ Multi-layer validation to prevent malicious uploads:
 1. File size validation
 2. Extension validation
 3. MIME type validation (magic bytes)
-4. Image integrity validation (Pillow)
+4. Format and dimension check from the image header (Pillow, no decode)
+5. Image integrity validation (Pillow)
+
+All layers run in a single pass over the file: the header is parsed once
+and oversized images are rejected before any verification work.
 """
 
 import os
+from dataclasses import dataclass
 import magic
 from PIL import Image
 from django.core.exceptions import ValidationError
-from django.conf import settings
 
 
 # Maximum file size: 10MB
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB in bytes
 
+# Maximum image dimensions: 50 megapixels (decompression bomb guard)
+MAX_PIXELS = 50_000_000
+
+# Bytes read from the start of the file for magic byte detection
+HEADER_SIZE = 2048
+
 # Allowed file extensions
 ALLOWED_EXTENSIONS = [".jpg", ".jpeg", ".png", ".webp"]
 
 # Allowed MIME types (must match actual file content)
 ALLOWED_MIME_TYPES = ["image/jpeg", "image/png", "image/webp"]
 
+# Pillow format name -> MIME type for the allowed formats
+FORMAT_MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+}
 
-def validate_image_file(file):
+
+# Bytes needed to recognise every allowed format from its signature
+SIGNATURE_SIZE = 12
+
+
+def sniff_image_type(header):
     """
-    Multi-layer validation for uploaded image files.
+    Identify an allowed image format from its leading bytes.
+
+    Cheap pre-check for streaming uploads, before the file is complete.
+    Returns the MIME type, or None if the signature isn't an allowed format.
+    """
+    if header.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+@dataclass(frozen=True)
+class ImageInfo:
+    """Facts about a validated image, gathered during validation."""
+    format: str
+    width: int
+    height: int
+    size: int
+    mime_type: str
+
+    @property
+    def pixels(self):
+        return self.width * self.height
+
+
+def inspect_image_file(file):
+    """
+    Validate an uploaded image file and return what was learned about it.
 
     Validates:
     1. File size (max 10MB)
     2. File extension (jpg, jpeg, png, webp)
     3. MIME type via magic bytes (not just extension)
-    4. Image integrity (can be opened and verified by Pillow)
+    4. Format and dimensions from the header (max 50 megapixels)
+    5. Image integrity (verified by Pillow)
+
+    The image is opened once: Pillow parses the header lazily, so format
+    and dimensions are known (and the pixel limit enforced) before
+    verify() reads the rest of the file.
 
     Args:
         file: Django UploadedFile object
 
+    Returns:
+        ImageInfo with format, dimensions, byte size and MIME type
+
     Raises:
         ValidationError: If validation fails at any layer
     """
@@ -58,9 +117,9 @@ def validate_image_file(file):
         )
 
     # Layer 3: MIME type validation (magic bytes)
-    # Read first 1KB to detect file type
-    file_start = file.read(1024)
-    file.seek(0)  # Reset file pointer for later reading
+    file.seek(0)
+    file_start = file.read(HEADER_SIZE)
+    file.seek(0)  # Reset file pointer for Pillow
 
     mime_type = magic.from_buffer(file_start, mime=True)
 
@@ -70,33 +129,60 @@ def validate_image_file(file):
             f"but only image files are allowed."
         )
 
-    # Layer 4: Image integrity validation
-    # Try to open and verify the image with Pillow
+    # Layer 4: Format and dimensions from the header (no pixel decode)
     try:
         img = Image.open(file)
-        img.verify()  # Verify it's actually an image
-        file.seek(0)  # Reset file pointer again
+    except Image.DecompressionBombError as e:
+        file.seek(0)
+        raise ValidationError(f"Image dimensions too large. {str(e)}")
     except Exception as e:
+        file.seek(0)
         raise ValidationError(f"Invalid or corrupted image file. Error: {str(e)}")
 
-    # Additional check: Image dimensions (optional safety check)
-    # Reopen image to get dimensions (verify() closes the file)
+    width, height = img.size
+    if FORMAT_MIME_TYPES.get(img.format) != mime_type:
+        file.seek(0)
+        raise ValidationError(
+            f"Invalid file type. Image format {img.format} does not match {mime_type}."
+        )
+
+    # Sanity check: reject extremely large images (potential decompression bomb)
+    if width * height > MAX_PIXELS:
+        file.seek(0)
+        raise ValidationError(
+            f"Image dimensions too large ({width}x{height} = {width*height:,} pixels). "
+            f"Maximum is {MAX_PIXELS:,} pixels."
+        )
+
+    # Layer 5: Image integrity validation
     try:
-        img = Image.open(file)
-        width, height = img.size
-        file.seek(0)  # Reset file pointer
-
-        # Sanity check: reject extremely large images (potential decompression bomb)
-        MAX_PIXELS = 50_000_000  # 50 megapixels
-        if width * height > MAX_PIXELS:
-            raise ValidationError(
-                f"Image dimensions too large ({width}x{height} = {width*height:,} pixels). "
-                f"Maximum is {MAX_PIXELS:,} pixels."
-            )
-    except ValidationError:
-        raise  # Re-raise our validation error
+        img.verify()  # Verify it's actually an image
     except Exception as e:
-        raise ValidationError(f"Cannot read image dimensions. Error: {str(e)}")
+        raise ValidationError(f"Invalid or corrupted image file. Error: {str(e)}")
+    finally:
+        file.seek(0)  # Reset file pointer for storage
+
+    return ImageInfo(
+        format=img.format,
+        width=width,
+        height=height,
+        size=file.size,
+        mime_type=mime_type,
+    )
+
+
+def validate_image_file(file):
+    """
+    Multi-layer validation for uploaded image files.
+
+    Validator wrapper around inspect_image_file(). The resulting ImageInfo
+    is attached to the file as `image_info` so callers can reuse it
+    without reopening the image.
+
+    Raises:
+        ValidationError: If validation fails at any layer
+    """
+    file.image_info = inspect_image_file(file)
 
 
 def validate_file_size(file):
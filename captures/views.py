@@ -1,6 +1,13 @@
 from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
+from django.http import Http404
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import AuthenticationFailed
+from accounts.api.authentication import SignedTokenAuthentication
+from .events import streams_supported
+from .media import find_owned_file, serve
 from .models import CapturedItem
+from .transcripts import flush_transcript, write_behind_enabled
 
 
 @login_required
@@ -18,6 +25,9 @@ def capture_page(request):
     # If short_uuid in URL, load that capture
     short_uuid = request.GET.get('id')
     if short_uuid:
+        if write_behind_enabled():
+            # The page starts editing from this text and revision
+            flush_transcript(short_uuid, owner_id=request.user.pk)
         try:
             capture = CapturedItem.objects.for_user(request.user).get(short_uuid=short_uuid)
         except CapturedItem.DoesNotExist:
@@ -33,7 +43,31 @@ def capture_page(request):
     context = {
         'capture': capture,
         'images': capture.images.all(),
-        'image_count': capture.images.count(),
+        'image_count': capture.image_count,
+        'live_events': streams_supported(request),
     }
 
     return render(request, 'captures/capture.html', context)
+
+
+@require_safe
+def media_file(request, name):
+    """
+    Serve a captured image file to its owner.
+
+    Accepts the session or an API bearer token. Anything the user doesn't
+    own is a 404, so file names can't be probed. See captures.media.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        try:
+            user, _ = SignedTokenAuthentication().authenticate(request) or (None, None)
+        except AuthenticationFailed:
+            user = None
+    if user is None:
+        raise Http404
+
+    storage = find_owned_file(user, name)
+    if storage is None:
+        raise Http404
+    return serve(request, storage, name)
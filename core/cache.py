@@ -0,0 +1,57 @@
+"""
+File-based cache for entries that must stay until they are removed.
+
+DurableFileBasedCache is FileBasedCache with three changes, for data such
+as buffered writes (see captures.transcripts) rather than disposable
+copies:
+
+- Entries are never culled, so MAX_ENTRIES does not apply. FileBasedCache
+  lists the whole cache directory on every set() to decide whether to
+  cull, which gets slow as the directory grows.
+- add() is atomic across processes, so it can claim a key. FileBasedCache
+  checks for the key and then writes it, and two processes can both win.
+- values() yields every live entry, so a sweeper can find what is pending.
+"""
+
+import os
+import pickle
+import tempfile
+import zlib
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class DurableFileBasedCache(FileBasedCache):
+    """FileBasedCache without culling, with an atomic add(); see the module docstring."""
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._createdir()
+        fname = self._key_to_file(key, version)
+        fd, tmp_path = tempfile.mkstemp(dir=self._dir)
+        try:
+            with open(fd, 'wb') as f:
+                self._write_content(f, timeout, value)
+            while True:
+                try:
+                    # Unlike the rename set() uses, link() fails if the file exists
+                    os.link(tmp_path, fname)
+                    return True
+                except FileExistsError:
+                    if self.has_key(key, version):
+                        return False
+                    # It had expired and has_key() removed it
+        finally:
+            os.remove(tmp_path)
+
+    def _cull(self):
+        pass
+
+    def values(self):
+        """Yield the value of every entry that has not expired."""
+        for fname in self._list_cache_files():
+            try:
+                with open(fname, 'rb') as f:
+                    if not self._is_expired(f):
+                        yield pickle.loads(zlib.decompress(f.read()))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,92 @@
+"""
+PostgreSQL backend that reuses connections from an in-process pool.
+
+Django 4.2 has no connection pooling, and persistent connections
+(CONN_MAX_AGE) are kept per thread. Under ASGI each request's sync code
+runs in a fresh thread, so persistent connections are never reused there.
+This backend keeps CONN_MAX_AGE at 0 semantics (Django closes the
+connection at the end of each request) but "closing" returns the
+connection to a per-process pool, and opening one takes an idle
+connection from it, skipping the TCP and authentication handshake.
+
+Configured with a POOL entry in the database settings:
+
+    "POOL": {"max_size": 10, "timeout": 10}
+
+max_size bounds this process's connections; with N workers the database
+sees up to N * max_size. When CONN_HEALTH_CHECKS is enabled, connections
+idle for more than a few seconds are pinged before reuse.
+"""
+import os
+import threading
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from django.db.utils import OperationalError
+from core.db.pool import ConnectionPool, PoolTimeout
+
+try:
+    from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+except ImportError:  # pragma: no cover
+    TRANSACTION_STATUS_IDLE = 0
+
+# Ping connections idle for longer than this before reuse (with health checks)
+HEALTH_CHECK_AFTER = 5  # seconds
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_pool(self):
+        with _pools_lock:
+            pool = _pools.get(self.alias)
+            if pool is None or pool.pid != os.getpid():
+                # First use in this process (pools must not cross a fork)
+                options = self.settings_dict.get('POOL', {})
+                pool = _pools[self.alias] = ConnectionPool(
+                    max_size=options.get('max_size', 10),
+                    timeout=options.get('timeout', 10),
+                    check=ping if self.settings_dict['CONN_HEALTH_CHECKS'] else None,
+                    check_after=HEALTH_CHECK_AFTER,
+                )
+        return pool
+
+    def get_new_connection(self, conn_params):
+        # Set for reused connections too (the parent sets it when connecting)
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        try:
+            return self.get_pool().getconn(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+        except PoolTimeout as e:
+            raise OperationalError(str(e)) from e
+
+    def _close(self):
+        if self.connection is None:
+            return
+        conn = self.connection
+        with self.wrap_database_errors:
+            reusable = not (self.errors_occurred and not self.is_usable()) and reset(conn)
+            _pools[self.alias].putconn(conn, reusable=reusable)
+
+
+def reset(conn):
+    """Roll back anything left open; return False if the connection is broken."""
+    if conn.closed:
+        return False
+    try:
+        if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+    except Exception:
+        return False
+    return True
+
+
+def ping(conn):
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Exception:
+        return False
+    return reset(conn)
@@ -0,0 +1,81 @@
+"""
+A small thread-safe pool of database connections.
+
+Used by the postgresql_pool backend. Each process has its own pool; a
+connection is checked out when Django opens one and returned when Django
+closes it (at the end of every request, with CONN_MAX_AGE = 0).
+"""
+import collections
+import os
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Hands out up to max_size connections, reusing idle ones and opening new
+    ones with the `connect` callable passed to getconn(). getconn() blocks
+    for up to `timeout` seconds when all are in use.
+
+    Connections idle for longer than `check_after` seconds are tested with
+    `check(conn)` before reuse and replaced if the check fails.
+    """
+
+    def __init__(self, max_size, timeout=10, check=None, check_after=0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check = check
+        self.check_after = check_after
+        self.pid = os.getpid()
+        self._idle = collections.deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def getconn(self, connect):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f'No database connection available within {self.timeout}s')
+        try:
+            while True:
+                with self._lock:
+                    conn, idle_since = self._idle.pop() if self._idle else (None, None)
+                if conn is None:
+                    return connect()
+                if conn.closed:
+                    continue
+                if self.check is not None and time.monotonic() - idle_since >= self.check_after:
+                    if not self.check(conn):
+                        self.discard(conn)
+                        continue
+                return conn
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, reusable=True):
+        """Return a connection; it is closed instead if not reusable."""
+        try:
+            if reusable and not conn.closed:
+                with self._lock:
+                    # Most recently used last, so getconn() picks warm connections
+                    self._idle.append((conn, time.monotonic()))
+            else:
+                self.discard(conn)
+        finally:
+            self._slots.release()
+
+    def discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = list(self._idle), collections.deque()
+        for conn, _ in idle:
+            self.discard(conn)
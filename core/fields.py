@@ -0,0 +1,42 @@
+import shortuuid
+from django.db import models
+
+
+class ShortUUIDField(models.CharField):
+    """
+    The short, URL-friendly form of a model's `uuid` field.
+
+    The value is shortuuid's base57 encoding of the uuid, filled in when the
+    row is inserted (pre_save runs for save() and bulk_create() alike), so
+    decode() recovers the uuid without a query.
+    """
+
+    def __init__(self, *args, uuid_field='uuid', **kwargs):
+        self.uuid_field = uuid_field
+        kwargs.setdefault('max_length', 22)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('unique', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.uuid_field != 'uuid':
+            kwargs['uuid_field'] = self.uuid_field
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.attname)
+        if not value:
+            value = encode(getattr(model_instance, self.uuid_field))
+            setattr(model_instance, self.attname, value)
+        return value
+
+
+def encode(value):
+    """Return the short form of a UUID."""
+    return shortuuid.encode(value)
+
+
+def decode(short_uuid):
+    """Return the UUID a short_uuid encodes; raises ValueError if it isn't one."""
+    return shortuuid.decode(short_uuid)
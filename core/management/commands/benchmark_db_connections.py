@@ -0,0 +1,82 @@
+"""
+Measure the database cost of a minimal request under the current
+connection settings.
+
+Each simulated request sends request_started, runs one small query and
+sends request_finished, so connections are opened, reused, health-checked
+and closed exactly as in a real request. --thread-per-request runs every
+request in a new thread, as Django does for sync code under ASGI.
+
+Compare settings by running it once per configuration, e.g.:
+    DB_CONN_MAX_AGE=0 python manage.py benchmark_db_connections
+    DB_CONN_MAX_AGE=60 python manage.py benchmark_db_connections
+    DB_POOL_SIZE=5 python manage.py benchmark_db_connections --thread-per-request
+"""
+import statistics
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = 'Time simulated requests that each run one query, to compare connection settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Number of requests to simulate (default: 200)'
+        )
+        parser.add_argument(
+            '--thread-per-request',
+            action='store_true',
+            help='Run each request in a new thread, as under ASGI'
+        )
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        self.stdout.write(
+            f"{settings_dict['ENGINE']} CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']} "
+            f"CONN_HEALTH_CHECKS={settings_dict['CONN_HEALTH_CHECKS']} "
+            f"POOL={settings_dict.get('POOL')}"
+        )
+
+        # Warm up: first connection, pool creation, imports
+        self.request()
+        timings = []
+        for _ in range(options['requests']):
+            if options['thread_per_request']:
+                thread = threading.Thread(target=lambda: timings.append(self.request()))
+                thread.start()
+                thread.join()
+            else:
+                timings.append(self.request())
+
+        timings.sort()
+        self.stdout.write(
+            f"{len(timings)} requests: "
+            f"mean {statistics.mean(timings):.2f} ms, "
+            f"p50 {self.percentile(timings, 50):.2f} ms, "
+            f"p95 {self.percentile(timings, 95):.2f} ms, "
+            f"p99 {self.percentile(timings, 99):.2f} ms"
+        )
+
+    def request(self):
+        """Run one simulated request; return its duration in milliseconds."""
+        start = time.perf_counter()
+        request_started.send(sender=self.__class__)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        finally:
+            request_finished.send(sender=self.__class__)
+        return (time.perf_counter() - start) * 1000
+
+    @staticmethod
+    def percentile(sorted_values, percent):
+        index = min(len(sorted_values) - 1, round(percent / 100 * (len(sorted_values) - 1)))
+        return sorted_values[index]
@@ -1,24 +1,23 @@
+import random
 import uuid
-import shortuuid
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from core.fields import ShortUUIDField
 
 
 class BaseModel(models.Model):
     """Identity and timestamps for all models."""
     uuid = models.UUIDField(default=uuid.uuid4, editable=False)
-    short_uuid = models.CharField(max_length=22, editable=False, unique=True)
+    # Derived from uuid when the row is inserted
+    short_uuid = ShortUUIDField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         abstract = True
 
-    def save(self, *args, **kwargs):
-        if not self.short_uuid:
-            self.short_uuid = shortuuid.uuid()
-        super().save(*args, **kwargs)
-
 
 class OwnedModelManager(models.Manager):
     """Manager that provides user-scoped queries."""
@@ -38,3 +37,69 @@ class OwnedModel(BaseModel):
 
     class Meta:
         abstract = True
+
+
+# Share of take() calls that also purge full buckets, and how many at most
+THROTTLE_PURGE_PROBABILITY = 0.001
+THROTTLE_PURGE_BATCH_SIZE = 1000
+
+
+class ThrottleBucketManager(models.Manager):
+    def take(self, key, capacity, period, now):
+        """
+        Take a token from the bucket `key`, which holds up to `capacity`
+        tokens and refills at capacity/period tokens per second.
+
+        Returns 0 if a token was taken, otherwise the seconds until one is
+        available. Each call is a single conditional UPDATE in the common
+        case, so concurrent workers never overspend a bucket.
+        """
+        if random.random() < THROTTLE_PURGE_PROBABILITY:
+            self.purge_full(now)
+        interval = period / capacity
+        # Latest arrival time that still leaves a token in the bucket
+        limit = now + period - interval
+        for _ in range(2):
+            if self.filter(key=key, tat__lte=limit).update(tat=Greatest(F('tat'), Value(now)) + interval):
+                return 0
+            tat = self.filter(key=key).values_list('tat', flat=True).first()
+            if tat is not None:
+                return tat - limit
+            try:
+                with transaction.atomic():
+                    self.create(key=key, tat=now + interval)
+                return 0
+            except IntegrityError:
+                # Another request created the bucket first; take from it
+                continue
+        return interval
+
+    def purge_full(self, now, batch_size=THROTTLE_PURGE_BATCH_SIZE):
+        """
+        Delete up to `batch_size` buckets that have refilled completely.
+
+        A full bucket (tat <= now) behaves exactly like a missing one, so
+        this loses no state; it keeps the table to the keys seen recently
+        rather than every IP and user ever throttled. Returns the number
+        of buckets deleted.
+        """
+        full = self.filter(tat__lte=now).values('pk')[:batch_size]
+        return self.filter(pk__in=full).delete()[0]
+
+
+class ThrottleBucket(models.Model):
+    """
+    Rate-limit state for one throttle key, shared by every worker.
+
+    Stored as a theoretical arrival time (the generic cell rate algorithm
+    form of a token bucket): the bucket is full when tat <= now, and each
+    request pushes tat forward by period/capacity. One float per key, no
+    request history.
+    """
+    key = models.CharField(max_length=200, primary_key=True)
+    tat = models.FloatField()
+
+    objects = ThrottleBucketManager()
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,61 @@
+"""
+Static files storage with fingerprinted names and precompressed copies.
+
+CompressedManifestStaticFilesStorage is ManifestStaticFilesStorage (files
+are copied to name.<hash>.ext and {% static %} resolves to that name via
+staticfiles.json) that also writes gzip, and brotli if the `brotli`
+package is installed, siblings of each compressible file at collectstatic
+time. nginx serves the siblings directly (gzip_static), so nothing is
+compressed per request and fingerprinted files can be cached forever.
+"""
+
+import gzip
+import os
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.html', '.txt', '.xml', '.ico', '.wasm',
+}
+# Below this, the compressed copy saves less than a packet
+MIN_COMPRESS_SIZE = 256
+
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        compressed = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if not dry_run and not isinstance(processed, Exception):
+                # Compress the original too: it stays reachable under its plain name
+                for path in filter(None, {name, hashed_name}):
+                    if path not in compressed:
+                        compressed.add(path)
+                        self.compress(path)
+            yield name, hashed_name, processed
+
+    def compress(self, name):
+        """Write precompressed siblings of `name` that are smaller than it."""
+        if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            return
+        with self.open(name) as f:
+            data = f.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        for suffix, compress in compressors():
+            output = compress(data)
+            if len(output) < len(data):
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(output))
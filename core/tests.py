@@ -1,7 +1,17 @@
-from django.test import TestCase
+import gzip
+import os
+import tempfile
+from unittest import mock
+from django.test import RequestFactory, TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
 from django.db import models
-from core.models import BaseModel, OwnedModel
+from core.cache import DurableFileBasedCache
+from core.db.pool import ConnectionPool, PoolTimeout
+from core.fields import decode, encode
+from core.models import BaseModel, OwnedModel, ThrottleBucket
+from core.storage import CompressedManifestStaticFilesStorage
+from core.throttling import UserRateThrottle
 
 User = get_user_model()
 
@@ -35,7 +45,7 @@ class BaseModelTestCase(TestCase):
     def test_short_uuid_field_configuration(self):
         """Test short_uuid field is properly configured."""
         short_uuid_field = BaseModel._meta.get_field('short_uuid')
-        self.assertEqual(short_uuid_field.__class__.__name__, 'CharField')
+        self.assertIsInstance(short_uuid_field, models.CharField)
         self.assertEqual(short_uuid_field.max_length, 22)
         self.assertFalse(short_uuid_field.editable)
         self.assertTrue(short_uuid_field.unique)
@@ -71,12 +81,9 @@ class OwnedModelTestCase(TestCase):
         """Test that OwnedModel uses OwnedModelManager."""
         from core.models import OwnedModelManager
 
-        # Verify the manager is defined in the model
-        # For abstract models, we can check the class attributes
-        managers = [attr for attr in dir(OwnedModel) if not attr.startswith('_')]
-        # The model definition should have objects manager
-        # We just verify OwnedModelManager class exists and is properly imported
-        self.assertIsNotNone(OwnedModelManager)
+        # Abstract models still record their managers in _meta
+        self.assertIsInstance(OwnedModel._meta.default_manager, OwnedModelManager)
+        self.assertEqual(OwnedModel._meta.default_manager.name, 'objects')
 
     def test_for_user_method_exists(self):
         """Test that the manager has for_user method."""
@@ -125,3 +132,238 @@ class ShortUUIDGenerationTestCase(TestCase):
         # Generate another and verify uniqueness
         short_id2 = shortuuid.uuid()
         self.assertNotEqual(short_id, short_id2)
+
+    def test_short_uuid_encodes_uuid(self):
+        """Test that short_uuid is derived from uuid, for save() and bulk_create()."""
+        from captures.models import CapturedItem
+
+        user = User.objects.create_user(username='shortuuid', password='pass12345')
+        saved = CapturedItem.objects.create(owner=user)
+        bulk = CapturedItem.objects.bulk_create([CapturedItem(owner=user) for _ in range(2)])
+
+        for capture in [saved, *bulk]:
+            self.assertEqual(len(capture.short_uuid), 22)
+            self.assertEqual(capture.short_uuid, encode(capture.uuid))
+            self.assertEqual(decode(capture.short_uuid), capture.uuid)
+        self.assertEqual(
+            CapturedItem.objects.get(pk=saved.pk).short_uuid, saved.short_uuid
+        )
+
+    def test_existing_short_uuid_is_kept(self):
+        """Test that an already-set short_uuid is not re-derived."""
+        from captures.models import CapturedItem
+
+        user = User.objects.create_user(username='legacy', password='pass12345')
+        capture = CapturedItem.objects.create(owner=user, short_uuid='legacyShortUuid0000000')
+        capture.save()
+
+        capture.refresh_from_db()
+        self.assertEqual(capture.short_uuid, 'legacyShortUuid0000000')
+
+
+class ThrottleBucketTestCase(TestCase):
+    """Test the shared token-bucket rate limit."""
+
+    def test_burst_then_refill(self):
+        """Test that a full bucket allows `capacity` requests, then one per interval."""
+        take = ThrottleBucket.objects.take
+
+        self.assertEqual([take('k', 3, 60, 1000.0) for _ in range(3)], [0, 0, 0])
+        self.assertEqual(take('k', 3, 60, 1000.0), 20)
+        self.assertEqual(take('k', 3, 60, 1015.0), 5)
+        self.assertEqual(take('k', 3, 60, 1020.0), 0)
+        self.assertEqual(ThrottleBucket.objects.count(), 1)
+
+    def test_idle_bucket_refills_to_capacity_only(self):
+        """Test that tokens don't accumulate beyond capacity while idle."""
+        take = ThrottleBucket.objects.take
+        take('k', 2, 60, 0.0)
+
+        results = [take('k', 2, 60, 10000.0) for _ in range(3)]
+
+        self.assertEqual(results, [0, 0, 30])
+
+    def test_buckets_are_per_key(self):
+        """Test that one key's usage doesn't affect another's."""
+        ThrottleBucket.objects.take('a', 1, 60, 0.0)
+
+        self.assertGreater(ThrottleBucket.objects.take('a', 1, 60, 0.0), 0)
+        self.assertEqual(ThrottleBucket.objects.take('b', 1, 60, 0.0), 0)
+
+
+    def test_purge_deletes_only_full_buckets(self):
+        """Test that refilled buckets are purged and partly used ones kept."""
+        take = ThrottleBucket.objects.take
+        take('idle', 2, 60, 0.0)
+        take('busy', 2, 60, 90.0)
+
+        self.assertEqual(ThrottleBucket.objects.purge_full(100.0), 1)
+
+        self.assertEqual(list(ThrottleBucket.objects.values_list('key', flat=True)), ['busy'])
+        # The busy bucket kept its state
+        self.assertEqual(take('busy', 2, 60, 100.0), 0)
+        self.assertGreater(take('busy', 2, 60, 100.0), 0)
+
+    def test_take_purges_on_a_sample_of_calls(self):
+        """Test that take() occasionally purges full buckets."""
+        ThrottleBucket.objects.take('old', 1, 60, 0.0)
+
+        with mock.patch('core.models.random.random', return_value=0.5):
+            ThrottleBucket.objects.take('new', 1, 60, 1000.0)
+        self.assertTrue(ThrottleBucket.objects.filter(key='old').exists())
+
+        with mock.patch('core.models.random.random', return_value=0.0):
+            ThrottleBucket.objects.take('new', 1, 60, 2000.0)
+        self.assertEqual(list(ThrottleBucket.objects.values_list('key', flat=True)), ['new'])
+
+
+class UserRateThrottleTestCase(TestCase):
+    """Test the database-backed UserRateThrottle."""
+
+    class Throttle(UserRateThrottle):
+        rate = '2/min'
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.request.user = User.objects.create_user(username='throttled', password='pass12345')
+
+    def test_throttles_after_rate(self):
+        """Test that requests beyond the rate are refused with a wait time."""
+        results = []
+        for _ in range(3):
+            throttle = self.Throttle()
+            throttle.timer = lambda: 500.0
+            results.append(throttle.allow_request(self.request, None))
+
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(throttle.wait(), 30)
+        self.assertTrue(ThrottleBucket.objects.filter(key=f'throttle_user_{self.request.user.pk}').exists())
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+
+    def close(self):
+        self.closed = 1
+
+
+class ConnectionPoolTestCase(TestCase):
+    """Test the in-process connection pool used by postgresql_pool."""
+
+    def test_reuses_returned_connections(self):
+        """Test that a returned connection is handed out again instead of connecting."""
+        pool = ConnectionPool(max_size=2)
+        first = pool.getconn(FakeConnection)
+        pool.putconn(first)
+
+        self.assertIs(pool.getconn(FakeConnection), first)
+
+    def test_broken_connections_are_replaced(self):
+        """Test that closed or non-reusable connections are not handed out."""
+        pool = ConnectionPool(max_size=2)
+        closed, unusable = pool.getconn(FakeConnection), pool.getconn(FakeConnection)
+        pool.putconn(unusable, reusable=False)
+        closed.close()
+        pool.putconn(closed)
+
+        conn = pool.getconn(FakeConnection)
+
+        self.assertNotIn(conn, (closed, unusable))
+        self.assertTrue(unusable.closed)
+
+    def test_failed_health_check_replaces_connection(self):
+        """Test that idle connections failing the check are discarded."""
+        pool = ConnectionPool(max_size=1, check=lambda conn: False, check_after=0)
+        stale = pool.getconn(FakeConnection)
+        pool.putconn(stale)
+
+        self.assertIsNot(pool.getconn(FakeConnection), stale)
+        self.assertTrue(stale.closed)
+
+    def test_times_out_when_exhausted(self):
+        """Test that getconn() gives up once max_size connections are out."""
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+        pool.getconn(FakeConnection)
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(FakeConnection)
+
+    def test_failed_connect_releases_slot(self):
+        """Test that a connection error doesn't leak a pool slot."""
+        pool = ConnectionPool(max_size=1, timeout=0.01)
+
+        def fail():
+            raise OSError('refused')
+
+        with self.assertRaises(OSError):
+            pool.getconn(fail)
+        self.assertIsInstance(pool.getconn(FakeConnection), FakeConnection)
+
+
+class CompressedManifestStorageTestCase(TestCase):
+    """Test fingerprinted, precompressed static files."""
+
+    def setUp(self):
+        self.static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.static_root.cleanup)
+        self.storage = CompressedManifestStaticFilesStorage(location=self.static_root.name)
+        self.css = ('body { color: red; }\n' * 50).encode()
+        self.storage.save('app.css', ContentFile(self.css))
+        self.storage.save('tiny.js', ContentFile(b'x=1'))
+        self.storage.save('logo.png', ContentFile(b'\x89PNG' * 100))
+
+    def collect(self):
+        paths = {name: (self.storage, name) for name in ['app.css', 'tiny.js', 'logo.png']}
+        return list(self.storage.post_process(paths))
+
+    def test_compresses_hashed_and_original_files(self):
+        """Test that compressible files get .gz siblings under both names."""
+        self.collect()
+
+        hashed = self.storage.stored_name('app.css')
+        self.assertRegex(hashed, r'^app\.[0-9a-f]{12}\.css$')
+        for name in ['app.css', hashed]:
+            with self.storage.open(name + '.gz') as f:
+                self.assertEqual(gzip.decompress(f.read()), self.css)
+
+    def test_skips_small_and_binary_files(self):
+        """Test that tiny files and non-text types are not compressed."""
+        self.collect()
+
+        root = self.static_root.name
+        self.assertFalse(any(name.startswith(('tiny', 'logo')) and name.endswith('.gz') for name in os.listdir(root)))
+
+    @override_settings(STATIC_URL='/static/')
+    def test_url_is_fingerprinted(self):
+        """Test that {% static %} URLs point at the hashed name."""
+        self.collect()
+
+        self.assertRegex(self.storage.url('app.css'), r'^/static/app\.[0-9a-f]{12}\.css$')
+
+
+class DurableFileBasedCacheTestCase(TestCase):
+    """Test the file cache used for buffered writes."""
+
+    def setUp(self):
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache = DurableFileBasedCache(cache_dir.name, {'OPTIONS': {'MAX_ENTRIES': 2}})
+
+    def test_add_claims_a_key_once(self):
+        """Test that add() only succeeds for a missing or expired key."""
+        self.assertTrue(self.cache.add('claim', 'first', timeout=None))
+        self.assertFalse(self.cache.add('claim', 'second', timeout=None))
+        self.assertEqual(self.cache.get('claim'), 'first')
+
+        self.cache.set('expired', 'old', timeout=-1)
+        self.assertTrue(self.cache.add('expired', 'new'))
+        self.assertEqual(self.cache.get('expired'), 'new')
+
+    def test_entries_are_never_culled(self):
+        """Test that MAX_ENTRIES is ignored and values() lists every live entry."""
+        for i in range(5):
+            self.cache.set(f'key{i}', i, timeout=None)
+        self.cache.set('expired', 'old', timeout=-1)
+
+        self.assertEqual(sorted(self.cache.values()), [0, 1, 2, 3, 4])
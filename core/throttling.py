@@ -0,0 +1,40 @@
+"""
+Throttles backed by a shared token bucket.
+
+DRF's SimpleRateThrottle keeps a list of request timestamps per user in the
+cache. With a per-process cache each worker enforces its own limit, and every
+request rewrites the whole list. These throttles keep one ThrottleBucket row
+per user and scope in the database instead, so the limit holds across
+workers and each check is a single UPDATE.
+"""
+from rest_framework import throttling
+from core.models import ThrottleBucket
+
+
+class TokenBucketRateThrottle(throttling.SimpleRateThrottle):
+    """
+    SimpleRateThrottle with database token buckets.
+
+    A rate of "100/hour" allows bursts of up to 100 requests, refilling
+    steadily at one request every 36 seconds.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self._wait = ThrottleBucket.objects.take(
+            self.key, self.num_requests, self.duration, self.timer()
+        )
+        return self._wait <= 0
+
+    def wait(self):
+        return self._wait
+
+
+class UserRateThrottle(TokenBucketRateThrottle, throttling.UserRateThrottle):
+    """Limits authenticated users by user id and anonymous users by IP."""
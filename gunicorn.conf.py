@@ -0,0 +1,115 @@
+"""
+Gunicorn configuration for production.
+
+Gunicorn loads this file automatically from the working directory, so the
+container only needs to run `gunicorn`. Every setting can be overridden
+with an environment variable:
+
+GUNICORN_WORKER_CLASS
+    "asgi" (default): uvicorn workers serving schmango.asgi. Needed for
+    the async API handlers and live event streams, which would otherwise
+    each hold a thread for as long as the client is connected.
+    "gthread": threaded WSGI workers (GUNICORN_THREADS per worker).
+    "sync": one request at a time per WSGI worker.
+GUNICORN_WORKERS
+    Defaults to a CPU-based count (2 * CPUs + 1 for sync workers, CPUs + 1
+    otherwise), capped so that GUNICORN_WORKER_MEMORY_MB per worker fits
+    in the container's memory. CPU and memory limits of the container's
+    cgroup are respected.
+GUNICORN_THREADS
+    Threads per gthread worker (default 4).
+GUNICORN_MAX_REQUESTS, GUNICORN_MAX_REQUESTS_JITTER
+    Restart a worker after about this many requests (default 1000, +0-100)
+    to cap memory growth. 0 disables recycling.
+GUNICORN_TIMEOUT
+    Seconds a worker may be silent before it is killed (default 120).
+
+The application is loaded once in the master (preload_app) and the
+master's objects are moved out of the garbage collector's reach with
+gc.freeze() before forking, so workers share those pages copy-on-write
+instead of duplicating them on their first collection. Anything that must
+not cross a fork (database connections, threads, pools) is created lazily
+in the workers.
+"""
+
+import gc
+import multiprocessing
+import os
+
+WORKER_CLASSES = {
+    "asgi": "uvicorn_worker.UvicornWorker",
+    "gthread": "gthread",
+    "sync": "sync",
+}
+
+
+def cpu_count():
+    """CPUs this process may use, honoring cgroup v2 CPU quotas."""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = multiprocessing.cpu_count()
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            count = min(count, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return count
+
+
+def memory_bytes():
+    """Memory available to the container (cgroup v2 limit or physical RAM)."""
+    try:
+        with open("/sys/fs/cgroup/memory.max") as f:
+            limit = f.read().strip()
+        if limit != "max":
+            return int(limit)
+    except (OSError, ValueError):
+        pass
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def default_workers(kind):
+    cpus = cpu_count()
+    by_cpu = 2 * cpus + 1 if kind == "sync" else cpus + 1
+    per_worker = int(os.environ.get("GUNICORN_WORKER_MEMORY_MB", "256")) * 1024 * 1024
+    by_memory = max(1, memory_bytes() // per_worker)
+    return max(1, min(by_cpu, by_memory))
+
+
+worker_kind = os.environ.get("GUNICORN_WORKER_CLASS", "asgi")
+if worker_kind not in WORKER_CLASSES:
+    raise ValueError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}")
+
+wsgi_app = "schmango.asgi:application" if worker_kind == "asgi" else "schmango.wsgi:application"
+worker_class = WORKER_CLASSES[worker_kind]
+workers = int(os.environ.get("GUNICORN_WORKERS", "0")) or default_workers(worker_kind)
+threads = int(os.environ.get("GUNICORN_THREADS", "4")) if worker_kind == "gthread" else 1
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+# nginx keeps connections to us open between requests
+keepalive = 5
+
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+preload_app = True
+accesslog = "-"
+
+
+def when_ready(server):
+    """Runs in the master once the app is loaded, before any worker forks."""
+    from django.db import connections
+
+    # Don't hand the master's connections (if any) to every worker
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+    server.log.info(
+        "%d worker(s) x %d thread(s); gc frozen with %d objects",
+        server.cfg.workers, server.cfg.threads, gc.get_freeze_count(),
+    )
@@ -7,8 +7,8 @@ This router aggregates them under /api/.
 from django.urls import path, include
 
 urlpatterns = [
+    path("accounts/", include("accounts.api.urls")),
     path("captures/", include("captures.api.urls")),
     # Future APIs will be added here:
     # path("items/", include("items.api.urls")),
-    # path("accounts/", include("accounts.api.urls")),
 ]
@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'schmango.settings.production')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup: upload size limits before Django reads bodies, and
+# event streams that end when their client disconnects
+from captures.asgi import EventStreamDisconnectMiddleware, UploadLimitMiddleware  # noqa: E402
+
+application = EventStreamDisconnectMiddleware(UploadLimitMiddleware(django_application))
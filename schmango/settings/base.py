@@ -88,6 +88,60 @@ STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Internal nginx location that media views hand files to with
+# X-Accel-Redirect; None serves them from Django (see captures/media.py)
+CAPTURES_MEDIA_ACCEL_REDIRECT = None
+
+# Caches
+# In-process by default; production overrides with a cache shared by all workers
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+}
+
+# Captures
+
+# Cache alias for per-user capture API responses (None disables)
+CAPTURES_RESPONSE_CACHE = "default"
+CAPTURES_RESPONSE_CACHE_TIMEOUT = 300  # seconds
+
+# Write-behind for transcript autosaves (see captures/transcripts.py for the
+# durability guarantees). The buffer cache must be shared by every worker
+# and survive restarts, so this stays off with the in-process LocMemCache.
+CAPTURES_TRANSCRIPT_WRITE_BEHIND = os.environ.get("CAPTURES_TRANSCRIPT_WRITE_BEHIND", "False") == "True"
+CAPTURES_TRANSCRIPT_BUFFER_CACHE = "default"
+CAPTURES_TRANSCRIPT_FLUSH_INTERVAL = 2.0  # seconds
+
+# Live capture events over SSE (see captures/events.py): "local" fans out
+# within one process, "postgres" uses LISTEN/NOTIFY across workers, None disables
+CAPTURES_EVENT_BROKER = "local"
+CAPTURES_EVENT_KEEPALIVE = 15  # seconds between SSE keepalive comments
+
+# Name image files by content hash so identical uploads are stored once
+CAPTURES_CONTENT_ADDRESSED_STORAGE = True
+
+# Thread pool size for validating multi-file uploads (1 = sequential)
+CAPTURES_VALIDATION_WORKERS = int(os.environ.get("CAPTURES_VALIDATION_WORKERS", "4"))
+
+# Resized image variants generated by `manage.py process_derivatives`
+# Longest side in pixels, keyed by the name exposed in the API
+CAPTURES_DERIVATIVE_SIZES = {
+    "thumb": 320,
+    "medium": 1280,
+}
+CAPTURES_DERIVATIVE_FORMAT = "WEBP"  # or "JPEG"
+CAPTURES_DERIVATIVE_QUALITY = 80
+CAPTURES_DERIVATIVE_MAX_ATTEMPTS = 3
+CAPTURES_DERIVATIVE_CLAIM_TIMEOUT = 600  # seconds a worker may hold a job
+
+# Resumable uploads: partial files live here until finalized (not web-served)
+CAPTURES_UPLOAD_TEMP_DIR = os.environ.get(
+    "CAPTURES_UPLOAD_TEMP_DIR", str(BASE_DIR / "tmp" / "uploads")
+)
+# Largest chunk accepted in a single PUT
+CAPTURES_UPLOAD_MAX_CHUNK_SIZE = 2 * 1024 * 1024
 
 # Default primary key field type
 
@@ -100,14 +154,30 @@ LOGIN_URL = "login"
 LOGIN_REDIRECT_URL = "profile"
 LOGOUT_REDIRECT_URL = "login"
 
+# Serve sessions and the logged-in user from the cache on each request.
+# Both caches must be shared by every worker so logouts and user changes are
+# seen everywhere (production's default cache is file-based on a volume).
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+# A single backend, so a failed login hashes the password once. Sessions
+# that named ModelBackend were moved over by accounts migration 0003.
+AUTHENTICATION_BACKENDS = [
+    "accounts.backends.CachedModelBackend",
+]
+ACCOUNTS_USER_CACHE_TIMEOUT = 60  # seconds
+
+# Lifetime of API bearer tokens (see accounts/api/tokens.py)
+ACCOUNTS_API_TOKEN_MAX_AGE = 7 * 24 * 60 * 60  # seconds
+
 # Django REST Framework
 
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
+    # Scripted clients get a bearer token from /api/accounts/token/ instead
+    # of sending a password (and paying for a password hash) on every request
     "DEFAULT_AUTHENTICATION_CLASSES": [
+        "accounts.api.authentication.SignedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
-        "rest_framework.authentication.BasicAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -43,10 +43,11 @@ if (BASE_DIR / "frontend" / "dist").exists():
 REST_FRAMEWORK = {
     **REST_FRAMEWORK,  # Inherit from base settings
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
+        "core.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "user": "10000/hour",  # 10x production
         "upload": "1000/hour",  # 10x production
+        "token": "200/hour",  # 10x production
     },
 }
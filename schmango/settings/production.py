@@ -12,11 +12,55 @@ if not SECRET_KEY:
     raise ValueError("DJANGO_SECRET_KEY environment variable must be set")
 
 # Database - PostgreSQL from environment
+#
+# DB_CONN_MAX_AGE keeps each thread's connection open between requests. That
+# helps sync (WSGI) workers only: under ASGI every request runs its sync code
+# in a new thread, so set DB_POOL_SIZE instead, which reuses connections from
+# a per-process pool (see core/db/backends/postgresql_pool). Benchmark with
+# `python manage.py benchmark_db_connections`.
 DATABASES = {
     "default": dj_database_url.config(
-        default="postgresql://schmango:development_password@db:5432/schmango"
+        default="postgresql://schmango:development_password@db:5432/schmango",
+        conn_max_age=int(os.environ.get("DB_CONN_MAX_AGE", "0")),
+        conn_health_checks=os.environ.get("DB_CONN_HEALTH_CHECKS", "True") == "True",
     )
 }
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "0"))
+if DB_POOL_SIZE:
+    DATABASES["default"].update({
+        "ENGINE": "core.db.backends.postgresql_pool",
+        # Django closes the connection after each request, returning it to the pool
+        "CONN_MAX_AGE": 0,
+        "POOL": {
+            "max_size": DB_POOL_SIZE,
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+        },
+    })
+
+# Cache - file based so every gunicorn worker (and the derivative worker,
+# via the shared cache volume) sees the same entries and invalidations
+CACHE_DIR = os.environ.get("CACHE_DIR", str(BASE_DIR / "cache"))
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.path.join(CACHE_DIR, "default"),
+        "OPTIONS": {
+            "MAX_ENTRIES": 10000,
+        },
+    },
+    # Unflushed transcripts: never culled, and add() is atomic (see core/cache.py)
+    "transcripts": {
+        "BACKEND": "core.cache.DurableFileBasedCache",
+        "LOCATION": os.path.join(CACHE_DIR, "transcripts"),
+    },
+}
+CAPTURES_TRANSCRIPT_BUFFER_CACHE = "transcripts"
+
+# nginx sends authorized media from its internal /protected-media/ location
+CAPTURES_MEDIA_ACCEL_REDIRECT = "/protected-media/"
+
+# Several workers serve SSE streams, so events must cross processes
+CAPTURES_EVENT_BROKER = "postgres"
 
 # Security settings - strict for production
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
@@ -50,14 +94,22 @@ STATICFILES_DIRS = []
 if (BASE_DIR / "frontend" / "dist").exists():
     STATICFILES_DIRS = [BASE_DIR / "frontend" / "dist"]
 
+# Fingerprinted names with precompressed .gz/.br siblings (see core/storage.py);
+# {% static %} resolves through staticfiles.json, so run collectstatic on deploy
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "core.storage.CompressedManifestStaticFilesStorage"},
+}
+
 # Rate limiting - strict for production
 REST_FRAMEWORK = {
     **REST_FRAMEWORK,  # Inherit from base settings
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
+        "core.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "user": "1000/hour",
         "upload": "100/hour",
+        "token": "20/hour",
     },
 }
@@ -51,5 +51,6 @@ REST_FRAMEWORK = {
     "DEFAULT_THROTTLE_CLASSES": [],  # Disable throttling in tests
     "DEFAULT_THROTTLE_RATES": {
         "upload": "1000000/hour",  # High limit so tests don't actually throttle
+        "token": "1000000/hour",
     },
 }
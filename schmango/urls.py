@@ -15,12 +15,10 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
-from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 from hello.views import hello_world
-from captures.views import capture_page
+from captures.views import capture_page, media_file
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -28,12 +26,10 @@ urlpatterns = [
     path("accounts/", include('accounts.urls')),
     path("api/", include('schmango.api_urls')),
     path("capture/", capture_page, name='capture'),
+    # Captured images are private: ownership is checked before serving
+    path("media/<path:name>", media_file, name='media'),
 ]
 
-# Serve media files in development only
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
 # Custom error handlers (Django looks for these by default)
 # These use templates/403.html, 404.html, and 500.html automatically when DEBUG=False
 handler403 = 'django.views.defaults.permission_denied'